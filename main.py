@@ -1,14 +1,20 @@
 import pygame
 
+from src.alloc_trace import AllocTracker
 from src.state import StateManager
 from src.states.main_menu import MainMenuState
 from src.assets import Assets
+from src.stats_store import StatsStore
 
-import json
+import json, os
 
 SCREEN_W = 1280
 SCREEN_H = 720
 
+# логическое разрешение: вся отрисовка идёт в поверхность этого размера
+LOGICAL_W = 1280
+LOGICAL_H = 720
+
 def load_json(path, default=None):
     try:
         with open(path, 'r', encoding='utf-8') as f:
@@ -17,31 +23,102 @@ def load_json(path, default=None):
     except Exception:
         return default
 
+def create_display(size):
+    """
+    Окно настроенного размера и поверхность логического разрешения.
+    По возможности масштабирует сам SDL (pygame.SCALED, через рендерер),
+    иначе логическая поверхность растягивается в окно одним transform.scale за кадр
+    :param size: размер окна из settings.json
+    :return: (окно, логическая поверхность, объект окна SDL или None).
+             Объект окна должен жить, пока открыт дисплей: pygame хранит указатель
+             на него в данных окна SDL и обращается к нему при событиях окна
+    """
+    if size == (LOGICAL_W, LOGICAL_H):
+        window = pygame.display.set_mode(size)
+        return window, window, None
+
+    try:
+        from pygame._sdl2.video import Window
+
+        screen = pygame.display.set_mode((LOGICAL_W, LOGICAL_H), pygame.SCALED)
+        sdl_window = Window.from_display_module()
+        sdl_window.size = size
+        return screen, screen, sdl_window
+
+    except Exception:
+        window = pygame.display.set_mode(size)
+        return window, pygame.Surface((LOGICAL_W, LOGICAL_H)).convert(), None
+
 def main():
     pygame.init()
 
     settings = load_json('data/config/settings.json', {
         "screen_w": SCREEN_W,
         "screen_h": SCREEN_H,
-        "fps": 60
+        "fps": 60,
+        "idle_timeout_ms": 1000
     })
 
-    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    # sdl_window держится до pygame.quit(), иначе обработка событий окна читает освобождённую память
+    window, screen, sdl_window = create_display((settings.get('screen_w', SCREEN_W), settings.get('screen_h', SCREEN_H)))
     pygame.display.set_caption('Умный рыболов')
     clock = pygame.time.Clock()
 
     assets = Assets(screen)
 
-    sm = StateManager(screen, assets, settings)
+    sm = StateManager(screen, assets, settings, window, StatsStore())
     sm.push(MainMenuState(sm))
 
+    # диагностика выделений памяти: "alloc_trace": true или INHIBITORY_ALLOC_TRACE=1
+    tracker = None
+    if settings.get('alloc_trace') or os.environ.get('INHIBITORY_ALLOC_TRACE'):
+        tracker = AllocTracker()
+
     fps = settings.get('fps', 60)
+    idle_timeout = settings.get('idle_timeout_ms', 1000)
+    transitions = sm.transitions
     while sm.running:
-        dt = clock.tick(fps) / 1000.0
-        sm.handle_events(pygame.event.get())
-        sm.update(dt)
-        sm.render()
-        pygame.display.flip()
+        if sm.is_idle():
+            # статичный экран: спим до ввода или таймера, перерисовка только по событию.
+            # Пока состоянию есть что подготовить, не спим: шаг подготовки идёт после кадра
+            pending = sm.has_idle_work()
+            events = sm.wait_events(0 if pending else idle_timeout)
+            # время ожидания не игровое: иначе состояние, открытое этим же событием, получит его в update
+            clock.tick()
+            dt = 0.0
+            if not pending:
+                if not events:
+                    sm.idle_tick()
+                if not events and not sm.dirty:
+                    continue
+
+        else:
+            dt = clock.tick(fps) / 1000.0
+            events = pygame.event.get()
+
+        if sm.transitions != transitions:
+            # стек сменился на прошлом проходе: загрузка в enter не идёт в игровое время
+            transitions = sm.transitions
+            dt = 0.0
+
+        if tracker:
+            tracker.run_frame(sm, events, dt)
+        else:
+            sm.handle_events(events)
+            sm.update(dt)
+            sm.render()
+
+        if sm.frame_changed:
+            sm.present()
+            pygame.display.flip()
+
+        if sm.has_idle_work():
+            # по шагу за проход, в том числе при непрерывном вводе: кадр уже выведен
+            sm.idle_tick()
+
+    sm.shutdown()
+    if tracker:
+        print('Отчёт о выделениях памяти:', tracker.close())
 
     pygame.quit()
 
@@ -0,0 +1,153 @@
+import gc, os, sys, time, tracemalloc
+
+from collections import defaultdict
+from typing import Dict, List
+
+
+REPORT_DIR = os.path.join('data', 'diagnostics')
+
+
+class AllocTracker:
+    """
+    Диагностический режим главного цикла: выделения памяти (tracemalloc)
+    и паузы сборщика мусора (gc.callbacks) по фазам кадра
+    <состояние>.<events|update|render>. Отчёт пишется при выходе
+    """
+    def __init__(self, sample_every: int = 60, top: int = 30, report_dir: str = REPORT_DIR) -> None:
+        self.sample_every = sample_every
+        self.top = top
+        self.report_dir = report_dir
+
+        self.frame = 0
+        self.phase = 'startup'
+
+        # фаза -> [кадров, сумма чистого прироста, макс. пик внутри фазы]
+        self.phase_mem: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
+        # (фаза, файл:строка) -> [байт, блоков] выжившие после фазы, по выборочным кадрам
+        self.line_alloc: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0])
+        self.sampled_frames = 0
+
+        # фаза -> поколение -> [сборок, сумма пауз, макс. пауза, собрано объектов]
+        self.gc_pauses: Dict[str, Dict[int, list]] = defaultdict(lambda: defaultdict(lambda: [0, 0.0, 0.0, 0]))
+        # файл:строка, на которой сработала сборка -> [сборок, сумма пауз]
+        self.gc_sites: Dict[str, list] = defaultdict(lambda: [0, 0.0])
+        self._gc_start = 0.0
+        self._gc_site = ''
+
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')
+        ]
+
+        tracemalloc.start(1)
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase: str, info: dict) -> None:
+        if phase == 'start':
+            try:
+                frame = sys._getframe(1)
+                self._gc_site = f'{frame.f_code.co_filename}:{frame.f_lineno}'
+            except ValueError:
+                self._gc_site = '?'
+            self._gc_start = time.perf_counter()
+            return
+
+        pause = time.perf_counter() - self._gc_start
+        stat = self.gc_pauses[self.phase][info.get('generation', -1)]
+        stat[0] += 1
+        stat[1] += pause
+        stat[2] = max(stat[2], pause)
+        stat[3] += info.get('collected', 0)
+
+        site = self.gc_sites[self._gc_site]
+        site[0] += 1
+        site[1] += pause
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    def _run_phase(self, name: str, sample: bool, fn, *args) -> None:
+        # сборки во время снимков относятся к самому трекеру, а не к фазе
+        self.phase = 'tracker'
+        before = self._snapshot() if sample else None
+
+        self.phase = name
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+
+        fn(*args)
+
+        current, peak = tracemalloc.get_traced_memory()
+        self.phase = 'tracker'
+        mem = self.phase_mem[name]
+        mem[0] += 1
+        mem[1] += current - start
+        mem[2] = max(mem[2], peak - start)
+
+        if sample:
+            for diff in self._snapshot().compare_to(before, 'lineno'):
+                if diff.size_diff > 0:
+                    frame = diff.traceback[0]
+                    line = self.line_alloc[(name, f'{frame.filename}:{frame.lineno}')]
+                    line[0] += diff.size_diff
+                    line[1] += max(0, diff.count_diff)
+
+    def run_frame(self, sm, events: list, dt: float) -> None:
+        """Кадр главного цикла с замером каждой фазы"""
+        sample = self.frame % self.sample_every == 0
+        state = type(sm.stack[-1]).__name__ if sm.stack else '-'
+
+        self._run_phase(f'{state}.events', sample, sm.handle_events, events)
+        self._run_phase(f'{state}.update', sample, sm.update, dt)
+        self._run_phase(f'{state}.render', sample, sm.render)
+        self.phase = 'idle'
+
+        if sample:
+            self.sampled_frames += 1
+        self.frame += 1
+
+    def report(self) -> str:
+        lines = [f'Кадров: {self.frame}, из них с построчным замером: {self.sampled_frames} (каждый {self.sample_every}-й)', '']
+
+        lines.append('Фазы: чистый прирост памяти за кадр и пик временных выделений')
+        for name, (frames, net, peak) in sorted(self.phase_mem.items(), key=lambda kv: -kv[1][2]):
+            lines.append(f'  {name:<32} кадров {frames:>7}   прирост/кадр {net / max(frames, 1):>10.1f} Б   пик {peak:>10} Б')
+
+        lines.append('')
+        lines.append(f'Строки с наибольшим приростом внутри фазы (топ {self.top}, выборочные кадры)')
+        ranked = sorted(self.line_alloc.items(), key=lambda kv: -kv[1][0])[:self.top]
+        for (phase, where), (size, count) in ranked:
+            lines.append(f'  {size / max(self.sampled_frames, 1):>10.1f} Б/кадр {count:>8} блоков   {phase:<28} {where}')
+
+        lines.append('')
+        lines.append('Паузы GC по фазам')
+        for phase, gens in sorted(self.gc_pauses.items()):
+            for gen, (n, total, worst, collected) in sorted(gens.items()):
+                lines.append(f'  {phase:<32} пок. {gen}  сборок {n:>6}  всего {total * 1000:>9.2f} мс  макс {worst * 1000:>7.2f} мс  собрано {collected}')
+
+        lines.append('')
+        lines.append(f'Строки, на которых запускался GC (топ {self.top})')
+        for where, (n, total) in sorted(self.gc_sites.items(), key=lambda kv: -kv[1][1])[:self.top]:
+            lines.append(f'  {total * 1000:>9.2f} мс  {n:>6} сборок   {where}')
+
+        return '\n'.join(lines) + '\n'
+
+    def close(self) -> str:
+        """
+        Остановка замеров и запись отчёта
+        :return: путь к отчёту
+        """
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+        text = self.report()
+        tracemalloc.stop()
+
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, f"alloc_{time.strftime('%Y%m%d-%H%M%S')}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+        return path
@@ -1,16 +1,24 @@
 import pygame
 
-import os
+import hashlib, io, json, mmap, os
+
+
+CACHE_DIR = os.path.join('data', 'cache', 'assets')
 
 
 class Assets:
-    def __init__(self, screen: pygame.Surface, assets_dir: str = 'assets'):
+    def __init__(self, screen: pygame.Surface, assets_dir: str = 'assets', cache_dir: str = CACHE_DIR):
         self.screen = screen
         self.assets_dir = assets_dir
+        self.cache_dir = cache_dir
+
+        # отображённые в память файлы кэша: поверхности из frombuffer ссылаются на них
+        self._mapped = {}
 
         self.background_image = None
 
         self.images = {}
+        self.scaled_images = {}
         self.sounds = {}
 
     def get_image(self, key: str) -> pygame.Surface | None:
@@ -21,7 +29,7 @@ class Assets:
             if key in self.images:
                 return self.images[key]
 
-            img = pygame.image.load(self.assets_dir + f'/image/{key}.png').convert_alpha()
+            img = self._load_image(key)
             self.images[key] = img
 
             return img
@@ -29,6 +37,128 @@ class Assets:
         except Exception:
             return None
 
+    def _display_format(self) -> str:
+        """Пиксельный формат дисплея - часть ключа кэша"""
+        display = pygame.display.get_surface()
+        return f'{display.get_bitsize()}:' + ','.join(f'{m:x}' for m in display.get_masks())
+
+    def _load_image(self, key: str) -> pygame.Surface | None:
+        """
+        Загрузка изображения через кэш сконвертированных пикселей.
+        При промахе - декодирование PNG и запись в кэш
+        """
+        if pygame.display.get_surface() is None:
+            # без окна (симуляции) изображения не нужны
+            return None
+
+        with open(self.assets_dir + f'/image/{key}.png', 'rb') as f:
+            data = f.read()
+
+        src_hash = hashlib.sha1(data).hexdigest()
+        target = self._display_format()
+
+        img = self._load_cached(key, src_hash, target)
+        if img is None:
+            img = self._bake(key, data, src_hash, target)
+
+        return img
+
+    def _load_cached(self, key: str, src_hash: str, target: str) -> pygame.Surface | None:
+        try:
+            with open(os.path.join(self.cache_dir, f'{key}.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            if meta['hash'] != src_hash or meta['target'] != target:
+                return None
+
+            with open(os.path.join(self.cache_dir, f'{key}.raw'), 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            img = pygame.image.frombuffer(buf, tuple(meta['size']), meta['fmt'])
+
+        except Exception:
+            return None
+
+        if not meta['alpha']:
+            # непрозрачный фон: одна копия в формат дисплея без альфа-канала
+            img = img.convert()
+            buf.close()
+
+        elif list(img.get_masks()) != meta['masks']:
+            img = img.convert_alpha()
+            buf.close()
+
+        else:
+            self._mapped[key] = buf
+
+        return img
+
+    def _bake(self, key: str, data: bytes, src_hash: str, target: str) -> pygame.Surface:
+        img = pygame.image.load(io.BytesIO(data), f'{key}.png').convert_alpha()
+
+        w, h = img.get_size()
+        alpha = pygame.mask.from_surface(img, 254).count() != w * h
+        if alpha:
+            # порядок байт как у convert_alpha(): на little-endian это BGRA
+            fmt = 'BGRA' if img.get_masks()[0] == 0xFF0000 else 'RGBA'
+        else:
+            img = img.convert()
+            fmt = 'RGB'
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # замена через временный файл: старый .raw может быть отображён в память другим процессом
+            raw_path = os.path.join(self.cache_dir, f'{key}.raw')
+            with open(f'{raw_path}.{os.getpid()}.tmp', 'wb') as f:
+                f.write(pygame.image.tobytes(img, fmt))
+            os.replace(f'{raw_path}.{os.getpid()}.tmp', raw_path)
+
+            with open(os.path.join(self.cache_dir, f'{key}.json'), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'hash': src_hash,
+                    'target': target,
+                    'size': [w, h],
+                    'fmt': fmt,
+                    'alpha': alpha,
+                    'masks': list(img.get_masks())
+                }, f)
+
+        except OSError:
+            pass
+
+        return img
+
+    def bake_all(self) -> list[str]:
+        """
+        Заполнение кэша для всех изображений из assets/image
+        :return: имена изображений
+        """
+        keys = sorted(name[:-4] for name in os.listdir(self.assets_dir + '/image') if name.endswith('.png'))
+        for key in keys:
+            self.get_image(key)
+
+        return keys
+
+    def get_scaled_image(self, key: str, size: tuple[int, int]) -> pygame.Surface | None:
+        """
+        Изображение, масштабированное один раз под логическое разрешение
+        :param key: имя изображения
+        :param size: итоговый размер
+        :return: поверхность из кэша
+        """
+        cache_key = (key, size)
+        if cache_key in self.scaled_images:
+            return self.scaled_images[cache_key]
+
+        img = self.get_image(key)
+        if img is None:
+            return None
+
+        scaled = pygame.transform.smoothscale(img, size)
+        self.scaled_images[cache_key] = scaled
+
+        return scaled
+
     def get_sound(self, key: str) -> pygame.mixer.Sound | None:
         if not key:
             return None
@@ -46,4 +176,8 @@ class Assets:
             return None
 
     def get_music_list(self) -> list[str]:
-        return os.listdir(self.assets_dir + '/music')
\ No newline at end of file
+        try:
+            return os.listdir(self.assets_dir + '/music')
+
+        except OSError:
+            return []
\ No newline at end of file
@@ -0,0 +1,147 @@
+import os, struct, threading
+
+from typing import List, Tuple
+
+
+# типы событий
+EV_NAME = 0        # ent = id имени, a = длина, далее байты utf-8
+EV_TARGET = 1      # a = имя цели, b = клавиша
+EV_SPAWN = 2       # ent, a = имя, b = x, c = y, d = скорость * 1000
+EV_HIT = 3         # ent, a = имя, b = клавиша, c = время реакции (мс)
+EV_ERROR = 4       # ent, a = имя выбранной, b = клавиша, c = имя цели
+EV_EVICT = 5       # ent, a = имя, b = 1 если это была цель (пропуск)
+EV_DAYNIGHT = 6    # a = 1 день / 0 ночь
+EV_GAME_OVER = 7   # a = очки, b = жизни
+
+MAGIC = b'IPEV\x01'
+RECORD = struct.Struct('<dB5i')
+
+
+class EventLog:
+    """
+    Журнал игровых событий: кольцевой буфер фиксированного размера
+    и фоновый поток, пачками дописывающий бинарные записи в файл.
+    emit только кладёт кортеж в заранее выделенный слот и не пишет на диск
+    """
+    def __init__(self, path: str, capacity: int = 4096, batch: int = 256, flush_interval: float = 1.0) -> None:
+        self.path = path
+        self.capacity = capacity
+        self.batch = batch
+        self.flush_interval = flush_interval
+
+        self._slots: List[tuple | None] = [None] * capacity
+        self._head = 0
+        self._tail = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+        self._names = {}
+        self._names_list: List[str] = []
+        self._names_written = 0
+
+        # события, не поместившиеся в буфер
+        self.dropped = 0
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # один файл на сессию: id имён нумеруются с нуля; чужой журнал не перезаписывается
+        self._f = open(path, 'xb')
+        self._f.write(MAGIC)
+
+        self._thread = threading.Thread(target=self._run, name='event-log', daemon=True)
+        self._thread.start()
+
+    def name_id(self, name: str) -> int:
+        """Короткий числовой id строки (имени изображения)"""
+        nid = self._names.get(name)
+        if nid is None:
+            with self._lock:
+                nid = len(self._names_list)
+                self._names_list.append(name)
+                self._names[name] = nid
+
+        return nid
+
+    def emit(self, t: float, kind: int, ent: int = 0, a: int = 0, b: int = 0, c: int = 0, d: int = 0) -> None:
+        with self._lock:
+            if self._head - self._tail >= self.capacity:
+                self.dropped += 1
+                return
+
+            self._slots[self._head % self.capacity] = (t, kind, ent, a, b, c, d)
+            self._head += 1
+            pending = self._head - self._tail
+
+        if pending >= self.batch:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._lock:
+            names = self._names_list[self._names_written:]
+            self._names_written += len(names)
+
+            records = [self._slots[i % self.capacity] for i in range(self._tail, self._head)]
+            self._tail = self._head
+
+        if not names and not records:
+            return
+
+        buf = bytearray()
+        first_id = self._names_written - len(names)
+        for i, name in enumerate(names):
+            data = name.encode('utf-8')
+            buf += RECORD.pack(0.0, EV_NAME, first_id + i, len(data), 0, 0, 0)
+            buf += data
+
+        for rec in records:
+            buf += RECORD.pack(*rec)
+
+        self._f.write(buf)
+        self._f.flush()
+
+    def close(self) -> None:
+        """Остановка потока и запись оставшихся событий"""
+        if self._closed:
+            return
+
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+
+        self._flush()
+        self._f.close()
+
+
+def read_events(path: str) -> Tuple[List[str], List[tuple]]:
+    """
+    Чтение журнала
+    :return: (имена по id, события (t, kind, ent, a, b, c, d) без записей EV_NAME)
+    """
+    names: List[str] = []
+    events: List[tuple] = []
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if not data.startswith(MAGIC):
+        raise ValueError(f'{path}: не журнал событий')
+
+    pos = len(MAGIC)
+    while pos + RECORD.size <= len(data):
+        rec = RECORD.unpack_from(data, pos)
+        pos += RECORD.size
+
+        if rec[1] == EV_NAME:
+            size = rec[3]
+            names.append(data[pos:pos + size].decode('utf-8'))
+            pos += size
+        else:
+            events.append(rec)
+
+    return names, events
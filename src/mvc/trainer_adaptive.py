@@ -0,0 +1,107 @@
+import math
+
+from typing import Any, Dict
+
+
+class Ewma:
+    """Экспоненциально взвешенное среднее: O(1) на обновление"""
+    def __init__(self, alpha: float, value: float) -> None:
+        self.alpha = alpha
+        self.initial = value
+        self.value = value
+
+    def reset(self) -> None:
+        self.value = self.initial
+
+    def add(self, x: float) -> None:
+        self.value += self.alpha * (x - self.value)
+
+
+class Welford:
+    """Среднее и дисперсия потока по алгоритму Уэлфорда: O(1) на обновление"""
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def sd(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+class AdaptiveDifficulty:
+    """
+    Подстройка сложности под игрока по ходу партии.
+    Уровень level в [-1, 1] интегрирует отклонение доли попаданий от желаемой
+    (за вычетом доли ложных нажатий); от него зависят интервал появления,
+    скорость всплытия и доля целевых сущностей. Время реакции не даёт интервалу
+    опуститься ниже того, что игрок успевает обработать
+    """
+    def __init__(self, base: Dict[str, Any], desired_hit_rate: float = 0.8, gain: float = 0.05,
+                 alpha: float = 0.1, warmup: int = 5) -> None:
+        self.base = base
+        self.desired_hit_rate = desired_hit_rate
+        self.gain = gain
+        self.warmup = warmup
+
+        self.hit_rate = Ewma(alpha, desired_hit_rate)
+        self.false_alarm_rate = Ewma(alpha, 0.0)
+        self.reaction = Welford()
+
+        self.reset()
+
+    def reset(self) -> None:
+        self.level = 0.0
+        self.responses = 0
+
+        self.hit_rate.reset()
+        self.false_alarm_rate.reset()
+        self.reaction.reset()
+
+    def on_hit(self, reaction_time: float) -> None:
+        self.responses += 1
+        self.hit_rate.add(1.0)
+        self.false_alarm_rate.add(0.0)
+        self.reaction.add(reaction_time)
+
+    def on_error(self) -> None:
+        self.responses += 1
+        self.false_alarm_rate.add(1.0)
+
+    def on_miss(self) -> None:
+        """Цель ушла с поля без ответа"""
+        self.responses += 1
+        self.hit_rate.add(0.0)
+
+    def tick(self, dt: float, difficulty: Dict[str, Any], pool_size: int) -> None:
+        """
+        Шаг подстройки, постоянное время
+        :param dt: прошедшее игровое время
+        :param difficulty: рабочие параметры модели, обновляются на месте
+        :param pool_size: число видов сущностей, задаёт долю целей при равновероятном выборе
+        """
+        if self.responses < self.warmup:
+            return
+
+        error = self.hit_rate.value - self.false_alarm_rate.value - self.desired_hit_rate
+        self.level = min(1.0, max(-1.0, self.level + self.gain * error * dt))
+
+        interval = self.base['spawn_interval'] * (1.0 - 0.4 * self.level)
+        if self.reaction.n > 1:
+            # ускорять появление не быстрее, чем игрок успевает реагировать
+            interval = max(interval, min(self.base['spawn_interval'], self.reaction.mean + self.reaction.sd))
+
+        difficulty['spawn_interval'] = interval
+        difficulty['entity_speed'] = self.base['entity_speed'] * (1.0 + 0.5 * self.level)
+
+        ratio = self.base['target_ratio'] or 1.0 / max(pool_size, 1)
+        difficulty['target_ratio'] = min(0.9, max(0.05, ratio * (1.0 - 0.5 * self.level)))
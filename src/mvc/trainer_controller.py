@@ -9,13 +9,17 @@ class TrainerController:
         self.model = model
         self.state_manager = state_manager
 
+        self.start()
+
+    def start(self) -> None:
+        """Первая цель и сущность новой партии"""
         self.model.pick_new_target()
         self.model.spawn_entity()
 
     def handle_event(self, e):
         if e.type == pygame.KEYDOWN:
             if e.key in KEY_POOL:
-                mouse_pos = pygame.mouse.get_pos()
+                mouse_pos = self.state_manager.mouse_pos()
 
                 for entity in self.model.entities:
                     if entity.rect.collidepoint(mouse_pos):
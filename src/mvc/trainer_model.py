@@ -1,25 +1,44 @@
 import pygame
 
 from src.assets import Assets
+from src.event_log import EventLog, EV_TARGET, EV_SPAWN, EV_HIT, EV_ERROR, EV_EVICT, EV_DAYNIGHT, EV_GAME_OVER
+from src.mvc.trainer_adaptive import AdaptiveDifficulty
+from src.stats_store import StatsStore
 from typing import Dict, List
 
-import random, json, time
+import random, json, os, time
 
 
 KEY_POOL = [pygame.K_SPACE, pygame.K_w, pygame.K_s, pygame.K_d, pygame.K_f, pygame.K_g, pygame.K_h, pygame.K_j, pygame.K_k, pygame.K_l]
 
+# параметры сложности, переопределяются ключом "difficulty" в settings.json
+DEFAULT_DIFFICULTY = {
+    'spawn_interval': 1.0,    # секунд между появлениями
+    'entity_speed': 2,        # пикселей за кадр при всплытии
+    'max_entities': 3,        # сверх этого числа старейшая сущность уходит
+    'lives': 3,
+    'daynight_period': 30.0,  # секунд между сменой дня и ночи
+    'target_ratio': 0.0,      # доля целевых среди появляющихся, 0 - равновероятный выбор из пула
+    'adaptive': False         # подстраивать интервал, скорость и долю целей под игрока
+}
+
+# прочитанные конфиги сущностей: день/ночь
+_entities_cache: Dict[bool, List[Dict]] = {}
+
 
 class Entity:
-    def __init__(self, data: dict, target_pos: tuple):
+    def __init__(self, data: dict, target_pos: tuple, entity_id: int = 0, created_at: float = 0.0, speed: float = 2):
         self.data = data
+        self.id = entity_id
 
         self.pos = (target_pos[0], target_pos[1] + 100)
         self.target_pos = target_pos
-        self.speed = 2
+        self.speed = speed
 
         self.rect = pygame.Rect(*self.pos, 100, 100)
 
-        self.created_at = time.time()
+        # игровое время появления
+        self.created_at = created_at
 
     def update(self):
         if abs(self.target_pos[1] - self.pos[1]) > 2:
@@ -28,19 +47,38 @@ class Entity:
 
 
 class TrainerModel:
-    def __init__(self, assets: Assets, settings: dict) -> None:
+    def __init__(self, assets: Assets, settings: dict, store: StatsStore | None = None, event_log: EventLog | None = None,
+                 rng: random.Random | None = None, profile_id: str | None = None) -> None:
         self.assets = assets
         self.settings = settings
+        self.store = store
+        self.event_log = event_log
+        # профиль, выбранный на момент начала партии: в его шард пишется итог
+        self.profile_id = profile_id
+
+        # источник случайности: для воспроизводимых симуляций передаётся random.Random(seed)
+        self.rng = rng if rng is not None else random
+        self.base_difficulty = {**DEFAULT_DIFFICULTY, **settings.get('difficulty', {})}
+        self.adaptive = AdaptiveDifficulty(self.base_difficulty) if self.base_difficulty['adaptive'] else None
 
         self.exit_rect = pygame.Rect(10, 10, 48, 32)
 
+        self.reset()
+
+    def reset(self) -> None:
+        """Начальное состояние партии: модель переиспользуется между играми"""
         self.day = True
         self.game_running = True
 
+        # рабочие параметры: адаптивный режим меняет их по ходу партии
+        self.difficulty = dict(self.base_difficulty)
+        if self.adaptive:
+            self.adaptive.reset()
+
         self.entities_pool = self._load_entities(self.day)
         self.entities: List[Entity] = []
 
-        self.lives = 3
+        self.lives = self.difficulty['lives']
 
         self.current_target: Dict | None = None
         self.current_target_key: int | None = None
@@ -54,22 +92,27 @@ class TrainerModel:
         self.game_start_time = None
         self.current_game_time = 0.0
         self.spawn_timer = 0.0
+        self.next_entity_id = 0
 
-
-    def _load_entities(self, is_day: bool) -> List[Dict]:
+    @staticmethod
+    def _load_entities(is_day: bool) -> List[Dict]:
         """
         Чтение сущностей из файла конфига
         :param is_day: день
         :return: список сущностей
         """
+        if is_day in _entities_cache:
+            return _entities_cache[is_day]
+
         try:
             if is_day:
-                with open('data\config\entities_day.json', 'r', encoding='utf-8') as f:
+                with open(os.path.join('data', 'config', 'entities_day.json'), 'r', encoding='utf-8') as f:
                     data = json.load(f)
             else:
-                with open('data\config\entities_night.json', 'r', encoding='utf-8') as f:
+                with open(os.path.join('data', 'config', 'entities_night.json'), 'r', encoding='utf-8') as f:
                     data = json.load(f)
 
+            _entities_cache[is_day] = data
             return data
 
         except Exception:
@@ -86,18 +129,41 @@ class TrainerModel:
 
         self.entities_pool = self._load_entities(self.day)
 
+        if self.event_log:
+            self.event_log.emit(self.current_game_time, EV_DAYNIGHT, a=int(self.day))
+
     def pick_new_target(self) -> None:
-        self.current_target = random.choice(self.entities_pool)
-        self.current_target_key = random.choice(KEY_POOL)
+        self.current_target = self.rng.choice(self.entities_pool)
+        self.current_target_key = self.rng.choice(KEY_POOL)
+
+        if self.event_log:
+            self.event_log.emit(self.current_game_time, EV_TARGET,
+                                a=self.event_log.name_id(self.current_target["image"]), b=self.current_target_key)
 
     def handle_selection(self, chosen_entity: Entity, pressed_key: int) -> None:
         if chosen_entity.data == self.current_target and pressed_key == self.current_target_key:
             self.score += 1
 
+            if self.event_log:
+                self.event_log.emit(self.current_game_time, EV_HIT, chosen_entity.id,
+                                    self.event_log.name_id(chosen_entity.data["image"]), pressed_key,
+                                    int((self.current_game_time - chosen_entity.created_at) * 1000))
+
+            if self.adaptive:
+                self.adaptive.on_hit(self.current_game_time - chosen_entity.created_at)
+
             self.entities.remove(chosen_entity)
             self.pick_new_target()
 
         else:
+            if self.event_log:
+                self.event_log.emit(self.current_game_time, EV_ERROR, chosen_entity.id,
+                                    self.event_log.name_id(chosen_entity.data["image"]), pressed_key,
+                                    self.event_log.name_id(self.current_target["image"]))
+
+            if self.adaptive:
+                self.adaptive.on_error()
+
             self._lose_life()
 
     def _lose_life(self):
@@ -120,6 +186,9 @@ class TrainerModel:
     def game_over(self):
         self.game_running = False
 
+        if self.event_log:
+            self.event_log.emit(self.current_game_time, EV_GAME_OVER, a=self.score, b=self.lives)
+
         snd = self.assets.get_sound('game_over')
         if snd:
             self.assets.get_sound('game_over').play()
@@ -131,27 +200,54 @@ class TrainerModel:
             'time': round(getattr(self, 'current_game_time', 0.0), 2),
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
         }
+        if self.event_log:
+            # журнал событий партии: stats/events/<профиль>/<event_log>
+            entry['event_log'] = os.path.basename(self.event_log.path)
+
+        if self.store is not None:
+            try:
+                self.store.append_session(entry, self.profile_id, timeout=2.0)
+
+            except (TimeoutError, ValueError, OSError) as exc:
+                # итог партии не теряется: допишется при следующей удачной записи
+                try:
+                    path = self.store.spool_session(entry, self.profile_id)
+                    print(f'Статистика не записана ({exc}), сессия отложена в {path}')
+                except (TimeoutError, OSError) as spool_exc:
+                    print(f'Статистика не записана ({exc}; {spool_exc}):', json.dumps(entry, ensure_ascii=False))
 
-        try:
-            with open('data/stats/stats.json', 'r', encoding='utf-8') as f:
-                arr = json.load(f)
-
-        except Exception:
-            arr = []
+    def spawn_entity(self) -> None:
+        if len(self.entities) > self.difficulty['max_entities']:
+            evicted = self.entities[0]
+            missed = evicted.data == self.current_target
 
-        arr.append(entry)
-        with open('data/stats/stats.json', 'w', encoding='utf-8') as f:
-            json.dump(arr, f, ensure_ascii=False, indent=2)
+            if self.event_log:
+                self.event_log.emit(self.current_game_time, EV_EVICT, evicted.id,
+                                    self.event_log.name_id(evicted.data["image"]), int(missed))
 
-    def spawn_entity(self) -> None:
-        if len(self.entities) > 3:
-            if self.entities[0].data == self.current_target:
+            if missed:
+                if self.adaptive:
+                    self.adaptive.on_miss()
                 self._lose_life()
 
             self.entities.pop(0)
 
-        ent = random.choice(self.entities_pool)
-        self.entities.append(Entity(ent, (random.choice([elem for elem in range(100, 1100, 50)]), random.choice([elem for elem in range(300, 600, 50)]))))
+        ratio = self.difficulty['target_ratio']
+        if ratio and self.current_target in self.entities_pool:
+            if self.rng.random() < ratio:
+                ent = self.current_target
+            else:
+                ent = self.rng.choice([e for e in self.entities_pool if e != self.current_target] or self.entities_pool)
+        else:
+            ent = self.rng.choice(self.entities_pool)
+        entity = Entity(ent, (self.rng.choice([elem for elem in range(100, 1100, 50)]), self.rng.choice([elem for elem in range(300, 600, 50)])),
+                        self.next_entity_id, self.current_game_time, self.difficulty['entity_speed'])
+        self.next_entity_id += 1
+        self.entities.append(entity)
+
+        if self.event_log:
+            self.event_log.emit(self.current_game_time, EV_SPAWN, entity.id, self.event_log.name_id(ent["image"]),
+                                entity.target_pos[0], entity.target_pos[1], int(entity.speed * 1000))
 
     def update(self, dt: float) -> None:
         self.spawn_timer += dt
@@ -160,12 +256,15 @@ class TrainerModel:
         for entity in self.entities:
             entity.update()
 
-        if self.current_game_time % 30 < dt:
+        if self.current_game_time % self.difficulty['daynight_period'] < dt:
             self.toggle_daynight()
 
-        if self.spawn_timer > 1.0:
+        if self.spawn_timer > self.difficulty['spawn_interval']:
             self.spawn_entity()
             self.spawn_timer = 0.0
 
+        if self.adaptive:
+            self.adaptive.tick(dt, self.difficulty, len(self.entities_pool))
+
         self.current_focus += dt
         self.max_focus = max(self.max_focus, self.current_focus)
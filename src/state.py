@@ -1,9 +1,15 @@
 import pygame
 
 from src.assets import Assets
+from src.stats_store import StatsStore
 
 
 class BaseState:
+    # статичный экран: главный цикл ждёт ввода вместо отрисовки каждый кадр
+    idle = False
+    # экран перерисовывается только по manager.request_redraw(), иначе кадр не выводится
+    retained = False
+
     def __init__(self, manager: 'StateManager'):
         self.manager = manager
 
@@ -15,6 +21,21 @@ class BaseState:
         """Вызывается при выходе из состояния"""
         pass
 
+    def prefetch(self):
+        """Заранее загрузить ресурсы, не входя в состояние"""
+        pass
+
+    def on_idle(self):
+        """
+        Вызывается, когда статичное состояние простаивало без событий,
+        а пока has_idle_work() - после каждого кадра
+        """
+        pass
+
+    def has_idle_work(self):
+        """Есть подготовка, которую не стоит откладывать до полного таймаута простоя"""
+        return False
+
     def handle_events(self, events):
         """Обработка событий"""
         pass
@@ -29,14 +50,28 @@ class BaseState:
 
 
 class StateManager:
-    def __init__(self, screen: pygame.Surface, assets: 'Assets', settings: dict) -> None:
+    def __init__(self, screen: pygame.Surface, assets: 'Assets', settings: dict, window: pygame.Surface | None = None, store: 'StatsStore | None' = None) -> None:
+        # screen - поверхность логического разрешения, window - окно с настроенным размером
         self.screen = screen
+        self.window = window if window is not None else screen
         self.assets = assets
         self.settings = settings
+        self.store = store
+
+        self.scale_x = self.window.get_width() / self.screen.get_width()
+        self.scale_y = self.window.get_height() / self.screen.get_height()
 
         self.stack = []
+        # переиспользуемые экземпляры состояний по классу
+        self.pool: dict[type, BaseState] = {}
 
         self.running = True
+        # нужна ли перерисовка в режиме ожидания
+        self.dirty = True
+        # счётчик смен состояния: главный цикл сбрасывает dt после перехода
+        self.transitions = 0
+        # изменился ли кадр при последней отрисовке
+        self.frame_changed = True
 
     def push(self, state: BaseState) -> None:
         """"""
@@ -46,6 +81,8 @@ class StateManager:
         self.stack.append(state)
 
         state.enter()
+        self.dirty = True
+        self.transitions += 1
 
     def pop(self) -> None:
         """"""
@@ -59,13 +96,94 @@ class StateManager:
         else:
             self.running = False
 
+        self.dirty = True
+        self.transitions += 1
+
     def switch(self, state: BaseState) -> None:
         """Переключение состояний"""
         self.pop()
         if state:
             self.push(state)
 
+    def get_state(self, cls: type) -> BaseState:
+        """Экземпляр состояния из пула (создаётся один раз)"""
+        state = self.pool.get(cls)
+        if state is None:
+            state = self.pool[cls] = cls(self)
+
+        return state
+
+    def prefetch(self, cls: type) -> None:
+        """Подготовка ресурсов состояния до перехода в него"""
+        self.get_state(cls).prefetch()
+
+    def idle_tick(self) -> None:
+        if self.stack:
+            self.stack[-1].on_idle()
+
+    def has_idle_work(self) -> bool:
+        """Текущему статичному состоянию есть что подготовить в простое"""
+        return self.is_idle() and self.stack[-1].has_idle_work()
+
+    def shutdown(self) -> None:
+        """Выход из всех состояний при закрытии окна"""
+        while self.stack:
+            self.stack.pop().exit()
+
+    def is_idle(self) -> bool:
+        """Текущее состояние статично и может ждать событий"""
+        return bool(self.stack) and self.stack[-1].idle
+
+    def request_redraw(self) -> None:
+        """Перерисовать экран при следующем проходе цикла, даже без событий"""
+        self.dirty = True
+
+    def wait_events(self, timeout_ms: int) -> list[pygame.event.Event]:
+        """
+        Блокирующее ожидание событий (ввод, таймеры pygame.time.set_timer)
+        :param timeout_ms: максимальное время ожидания
+        :return: список событий, пустой по истечении таймаута
+        """
+        e = pygame.event.wait(timeout_ms)
+        if e.type == pygame.NOEVENT:
+            return []
+
+        return [e] + pygame.event.get()
+
+    def to_logical(self, pos: tuple) -> tuple[int, int]:
+        """Перевод координат окна в координаты логической поверхности"""
+        return int(pos[0] / self.scale_x), int(pos[1] / self.scale_y)
+
+    def mouse_pos(self) -> tuple[int, int]:
+        """Позиция мыши в логических координатах"""
+        return self.to_logical(pygame.mouse.get_pos())
+
+    def present(self) -> None:
+        """Вывод логической поверхности в окно одним масштабированием"""
+        if self.window is self.screen:
+            return
+
+        if self.window.get_size() == self.screen.get_size():
+            self.window.blit(self.screen, (0, 0))
+        else:
+            # без сглаживания: smoothscale на 1080p съедает половину кадра
+            pygame.transform.scale(self.screen, self.window.get_size(), self.window)
+
+    def _to_logical_event(self, e: pygame.event.Event) -> pygame.event.Event:
+        if not hasattr(e, 'pos'):
+            return e
+
+        data = dict(e.dict)
+        data['pos'] = self.to_logical(e.pos)
+        return pygame.event.Event(e.type, data)
+
     def handle_events(self, events: list[pygame.event.Event]) -> None:
+        if self.window is not self.screen:
+            events = [self._to_logical_event(e) for e in events]
+
+        if any(e.type == pygame.WINDOWEXPOSED for e in events):
+            self.dirty = True
+
         if self.stack:
             self.stack[-1].handle_events(events)
 
@@ -74,5 +192,13 @@ class StateManager:
             self.stack[-1].update(dt)
 
     def render(self) -> None:
+        self.frame_changed = True
         if self.stack:
-            self.stack[-1].render()
+            state = self.stack[-1]
+            if state.retained and not self.dirty:
+                # ничего не изменилось: в окне остаётся прошлый кадр
+                self.frame_changed = False
+            else:
+                state.render()
+
+        self.dirty = False
@@ -22,6 +22,11 @@ class DiagnosisState(BaseState):
 
         self.finished = False
 
+    @property
+    def idle(self):
+        """После завершения таблица статична"""
+        return self.finished
+
     def enter(self):
         self.prepare_grid()
 
@@ -85,7 +90,7 @@ class DiagnosisState(BaseState):
         self.manager.screen.fill((255, 255, 255))
 
         pygame.draw.rect(self.manager.screen, (200, 200, 200), self.exit_rect)
-        self.manager.screen.blit(pygame.transform.smoothscale(self.manager.assets.get_image('exit'), (25, 25)), (self.exit_rect.x  + self.exit_rect.w // 2 - 12.5, self.exit_rect.y + self.exit_rect.h // 2 - 12.5))
+        self.manager.screen.blit(self.manager.assets.get_scaled_image('exit', (25, 25)), (self.exit_rect.x  + self.exit_rect.w // 2 - 12.5, self.exit_rect.y + self.exit_rect.h // 2 - 12.5))
 
         title = self.font.render(f"Таблица Шульте. Цель: {self.next_number}", True, (0,0,0))
         self.manager.screen.blit(title, (self.manager.screen.get_width() // 2 - title.get_width() // 2, 60))
@@ -1,6 +1,7 @@
 import pygame
 
 from src.state import BaseState
+from src.ui import Button, WidgetLayer
 from src.states.stats_state import StatsState
 from src.states.trainer_state import TrainerState
 from src.states.diagnosis_state import DiagnosisState
@@ -8,81 +9,107 @@ from src.states.diagnosis_state import DiagnosisState
 import os
 
 
-class Button:
-    def __init__(self, rect, text, callback, font):
-        self.rect = pygame.Rect(rect)
-        self.text = text
-        self.callback = callback
-        self.font = font
-
-        self.is_hovered = False
-
-    def draw(self, surf):
-        if self.is_hovered:
-            pygame.draw.rect(surf, (138, 158, 255), self.rect, border_radius=36)
-
-        txt = self.font.render(self.text, True, (0, 0, 0))
-        surf.blit(txt, txt.get_rect(center=self.rect.center))
-
-    def handle_event(self, e):
-        if e.type == pygame.MOUSEMOTION:
-            mouse_pos = pygame.mouse.get_pos()
-            if self.rect.collidepoint(mouse_pos):
-                self.is_hovered = True
-            else:
-                self.is_hovered = False
-
-        if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
-            if self.rect.collidepoint(e.pos):
-                self.callback()
-
-
 class MainMenuState(BaseState):
+    idle = True
+    retained = True
+
     def __init__(self, manager):
         super().__init__(manager)
 
         self.screen = None
         self.assets = None
         self.font = None
-        self.buttons = None
+        self.title = None
+        self.layer = None
+        self.profile_button = None
+        self.full_redraw = True
+
+        # состояния, которые подготавливаются в простое, в порядке вероятности перехода
+        self.prefetch_queue = [TrainerState, StatsState, DiagnosisState]
 
     def enter(self):
         self.screen = self.manager.screen
         self.assets = self.manager.assets
-        self.font = pygame.font.SysFont('arial', 24)
 
         self.assets.background_image = self.assets.get_image('background_main_menu')
 
+        if self.layer is None:
+            self._build()
+        else:
+            self.profile_button.set_text(self._profile_label())
+
+        # экран перекрывался другим состоянием: фон и кнопки рисуются целиком
+        self.layer.update_hover(self.manager.mouse_pos())
+        self.full_redraw = True
+
+    def _build(self) -> None:
+        """Кнопки и заголовок создаются один раз, подписи отрисовываются заранее"""
+        self.font = pygame.font.SysFont('arial', 24)
+        self.title = pygame.font.SysFont('arial', 36).render('Меню', True, (0, 0, 0))
+
         w, h = self.screen.get_size()
-        self.buttons = [
-            Button((w // 2 - 150, 360 + i * 70, 300, 60), name, cb, self.font)
-            for i, (name, cb) in enumerate([
-                ("Начать игру", lambda: self.manager.push(TrainerState(self.manager))),
-                ("Диагностика", lambda: self.manager.push(DiagnosisState(self.manager))),
-                ("Статистика", lambda: self.manager.push(StatsState(self.manager))),
-                ("Руководство", lambda: os.startfile(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '\data\guide.pdf'))
-            ])
-        ]
+        self.layer = WidgetLayer()
+        for i, (name, cb) in enumerate([
+            ("Начать игру", lambda: self.manager.push(self.manager.get_state(TrainerState))),
+            ("Диагностика", lambda: self.manager.push(self.manager.get_state(DiagnosisState))),
+            ("Статистика", lambda: self.manager.push(self.manager.get_state(StatsState))),
+            ("Руководство", lambda: os.startfile(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + '\data\guide.pdf')),
+            (self._profile_label(), self.next_profile)
+        ]):
+            self.profile_button = self.layer.add(Button((w // 2 - 150, 360 + i * 70, 300, 60), name, cb, self.font,
+                                                        hover_fill=(138, 158, 255), radius=36))
+
+    def _profile_label(self) -> str:
+        store = self.manager.store
+        return f"Профиль: {store.profile_name()}" if store else "Профиль: -"
+
+    def next_profile(self) -> None:
+        """Переключение на следующий профиль игрока"""
+        store = self.manager.store
+        if not store:
+            return
+
+        ids = [pid for pid, _ in store.profiles()]
+        current = store.active_profile
+        nxt = ids[(ids.index(current) + 1) % len(ids)] if current in ids else ids[0]
+        store.set_active(nxt)
+
+        self.profile_button.set_text(self._profile_label())
+
+    def on_idle(self):
+        """По одному состоянию за тик простоя, чтобы не задерживать ввод"""
+        if self.prefetch_queue:
+            self.manager.prefetch(self.prefetch_queue.pop(0))
+
+    def has_idle_work(self):
+        # очередь разбирается сразу после первого кадра меню, а не через таймаут простоя
+        return bool(self.prefetch_queue)
 
     def handle_events(self, events):
         for e in events:
             if e.type == pygame.QUIT:
                 self.manager.running = False
 
-            for b in self.buttons:
-                b.handle_event(e)
+            self.layer.handle_event(e)
+
+        if self.layer.damaged:
+            self.manager.request_redraw()
 
     def update(self, dt):
         pass
 
     def render(self):
+        if not self.full_redraw:
+            # фон не менялся: только кнопки, у которых сменился вид
+            self.layer.draw(self.screen)
+            return
+
         if self.assets.background_image:
             self.screen.blit(self.assets.background_image, (0, -50))
         else:
             self.screen.fill((228, 239, 246))
 
-        title = pygame.font.SysFont('arial', 36).render('Меню', True, (0, 0, 0))
-        self.screen.blit(title, (self.screen.get_width() // 2 - title.get_width() // 2, 60))
+        self.screen.blit(self.title, (self.screen.get_width() // 2 - self.title.get_width() // 2, 60))
 
-        for b in self.buttons:
-            b.draw(self.screen)
+        self.layer.draw(self.screen, full=True)
+        self.full_redraw = False
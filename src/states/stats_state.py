@@ -3,16 +3,19 @@ import pygame
 import os
 import json
 import csv
-from datetime import datetime
-from collections import defaultdict, OrderedDict
-from typing import Any, Dict, List, Tuple
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 from src.state import BaseState
+from src.stats_index import DailyRangeIndex
+from src.stats_store import DEFAULT_PROFILE, date_key
+from src.ui import Button, Container, WidgetLayer
 
 FONT_MAIN = None
 FONT_SMALL = None
 PADDING = 14
-STATS_PATH = os.path.join('data', 'stats', 'stats.json')
 EXPORT_PATH = os.path.join('data', 'stats', 'export_stats.csv')
 METRIC_KEYS = [
     ('total_score', 'Суммарно очков'),
@@ -20,6 +23,14 @@ METRIC_KEYS = [
     ('max_time', 'Макс. время игры (s)'),
     ('avg_time', 'Сред. время игры (s)')
 ]
+# масштабы графика: подпись и длина окна в календарных днях (0 - вся история)
+RANGE_OPTIONS = [
+    ('Неделя', 7),
+    ('Месяц', 30),
+    ('Год', 365),
+    ('Всё', 0)
+]
+CHART_CACHE_SIZE = 64
 
 def _ensure_fonts():
     global FONT_MAIN, FONT_SMALL
@@ -28,92 +39,239 @@ def _ensure_fonts():
     if FONT_SMALL is None:
         FONT_SMALL = pygame.font.SysFont('Arial', 14)
 
-def _parse_timestamp(ts_val: Any):
-    if ts_val is None:
-        return None
-    if isinstance(ts_val, (int, float)):
+def aggregate_stream(records: Iterable[Any]) -> Tuple['OrderedDict[str, Dict[str, Any]]', Dict[str, float]]:
+    """
+    Однопроходная агрегация сессий по датам: сырые записи не сохраняются
+    :return: (агрегаты по датам, общие показатели)
+    """
+    # дата -> [игр, сумма score, макс. фокус, макс. время, сумма времени, ошибки]
+    acc: Dict[str, list] = {}
+    count = 0
+    total_score = 0
+    times_count = 0
+    times_sum = 0.0
+    times_max = 0.0
+    for rec in records:
+        if not isinstance(rec, dict):
+            continue
         try:
-            return datetime.utcfromtimestamp(int(ts_val))
-        except Exception:
-            return None
-    if isinstance(ts_val, str):
-        formats = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d']
-        for fmt in formats:
-            try:
-                return datetime.strptime(ts_val, fmt)
-            except Exception:
-                continue
-    return None
+            score = int(rec.get('score', 0))
+            focus = float(rec.get('max_focus', 0.0))
+            game_time = float(rec.get('time', 0.0))
+        except (TypeError, ValueError):
+            continue
+        count += 1
+        total_score += score
+        if rec.get('time') is not None:
+            times_count += 1
+            times_sum += game_time
+            times_max = max(times_max, game_time)
+        key = date_key(rec.get('timestamp'))
+        if key is None:
+            continue
+        cell = acc.get(key)
+        if cell is None:
+            cell = acc[key] = [0, 0, focus, game_time, 0.0, {}]
+        cell[0] += 1
+        cell[1] += score
+        cell[2] = max(cell[2], focus)
+        cell[3] = max(cell[3], game_time)
+        cell[4] += game_time
+        errs = rec.get('errors') or {}
+        if isinstance(errs, dict):
+            errors_agg = cell[5]
+            for k, v in errs.items():
+                try:
+                    errors_agg[k] = errors_agg.get(k, 0) + int(v)
+                except Exception:
+                    pass
+    ordered = OrderedDict()
+    for key in sorted(acc.keys()):
+        games, score_sum, best_focus, max_time, time_sum, errors_agg = acc[key]
+        ordered[key] = {
+            'total_score': score_sum,
+            'best_max_focus': best_focus,
+            'max_time': max_time,
+            'avg_time': time_sum / games,
+            'sum_time': time_sum,
+            'games_count': games,
+            'errors': errors_agg
+        }
+    totals = {
+        'records': count,
+        'total_score': total_score,
+        'max_time': times_max,
+        'avg_time': (times_sum / times_count) if times_count else 0.0
+    }
+    return ordered, totals
+
+def aggregate_by_date(records: Iterable[Any]) -> 'OrderedDict[str, Dict[str, Any]]':
+    return aggregate_stream(records)[0]
+
+def date_positions(dates: List[str], start: str, end: str) -> List[float]:
+    """Положения дат 'YYYY-MM-DD' по горизонтали в долях календарного отрезка [start, end]"""
+    first = date.fromisoformat(start)
+    span = (date.fromisoformat(end) - first).days or 1
+    return [(date.fromisoformat(d) - first).days / span for d in dates]
+
+def lttb(values: List[float], threshold: int, xs: List[float] | None = None) -> Tuple[List[int], List[float]]:
+    """
+    Прореживание ряда алгоритмом Largest-Triangle-Three-Buckets
+    :param values: исходный ряд
+    :param threshold: число точек на выходе
+    :param xs: координаты точек по горизонтали (по умолчанию - номера)
+    :return: (индексы выбранных точек, их значения)
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(range(n)), list(values)
+    if xs is None:
+        xs = range(n)
+    indices = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(xs[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(values[avg_start:avg_end]) / (avg_end - avg_start)
+        ax, ay = xs[a], values[a]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (values[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        indices.append(best)
+        a = best
+    indices.append(n - 1)
+    return indices, [values[i] for i in indices]
+
+def draw_series_in_rect(surface: pygame.Surface, rect: pygame.Rect, values: List[float], fill: bool = False, draw_points: bool = False, xs: List[float] | None = None):
+    """xs - положения точек по горизонтали в долях ширины (например, по датам)"""
+    if not values:
+        return
+    if xs is not None and len(values) > rect.w:
+        idx, values = lttb(values, max(3, rect.w), xs)
+        xs = [xs[i] for i in idx]
+    elif xs is None:
+        if len(values) > rect.w:
+            idx, values = lttb(values, max(3, rect.w))
+            xs = [i / (idx[-1] or 1) for i in idx]
+        else:
+            xs = [i / (len(values) - 1 if len(values) > 1 else 1) for i in range(len(values))]
+    max_v = max(values) or 1.0
+    min_v = min(values) or 0.0
+    rng = max_v - min_v if (max_v - min_v) > 0 else 1.0
+    points: List[Tuple[int, int]] = []
+    for xf, v in zip(xs, values):
+        x = rect.x + int(xf * rect.w)
+        y_norm = (v - min_v) / rng
+        y = rect.y + rect.h - int(y_norm * rect.h)
+        points.append((x, y))
+    if fill and len(points) >= 2:
+        poly = [(points[0][0], rect.y + rect.h)] + points + [(points[-1][0], rect.y + rect.h)]
+        s = pygame.Surface((rect.w, rect.h), pygame.SRCALPHA)
+        offs = [(px - rect.x, py - rect.y) for px, py in poly]
+        pygame.draw.polygon(s, (80, 160, 120, 80), offs)
+        surface.blit(s, (rect.x, rect.y))
+    if len(points) >= 2:
+        pygame.draw.lines(surface, (120, 200, 140), False, points, 2)
+    # точки различимы, только пока между ними хватает места
+    if draw_points and len(points) * 8 <= rect.w:
+        for p in points:
+            pygame.draw.circle(surface, (200, 240, 200), p, 4)
 
 class StatsState(BaseState):
+    idle = True
+    retained = True
+
     def __init__(self, manager):
         super().__init__(manager)
         _ensure_fonts()
-        self.raw_list: List[Dict[str, Any]] = []
+        self.records_count = 0
+        self.overall: Dict[str, float] = {'total_score': 0, 'max_time': 0.0, 'avg_time': 0.0}
+        self.profile_name = ''
+        # причина, по которой история показана не полностью (повреждённый шард, не перенесённый stats.json)
+        self.history_warning: str | None = None
         self.date_series: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
         self.dates_list: List[str] = []
         self.selected_metric_index = 0
-        self.offset = 0
-        self.window_days = 10
+        self.range_index = 0
+        self.window_days = RANGE_OPTIONS[self.range_index][1]
+        # последний календарный день окна графика (None - день последней сессии)
+        self.window_end: date | None = None
+        self._chart_cache: Dict[tuple, Tuple[List[float], List[float]]] = {}
+        self.index: DailyRangeIndex | None = None
+        # диапазон дат для сравнения с текущим окном (клавиша C)
+        self.compare_range: Tuple[str, str] | None = None
         self.metric_rects: List[pygame.Rect] = []
-        self.btn_back_rect = pygame.Rect(18, 18, 120, 36)
-        self.btn_export_rect = pygame.Rect(156, 18, 160, 36)
-        self.btn_prev_rect = pygame.Rect(332, 18, 36, 36)
-        self.btn_next_rect = pygame.Rect(380, 18, 36, 36)
-        self.load_stats()
+        self.layer = WidgetLayer()
+        self.range_buttons: List[Button] = []
+        self._build_toolbar()
+        # содержимое (графики, сводка) изменилось и рисуется целиком
+        self.full_redraw = True
+
+    def _build_toolbar(self) -> None:
+        """Кнопки верхней панели с заранее отрисованными подписями"""
+        style = {'fill': (60, 60, 60), 'hover_fill': (90, 90, 90), 'text_color': (255, 255, 255)}
+        nav = {**style, 'fill': (80, 80, 80), 'hover_fill': (110, 110, 110)}
+
+        toolbar = self.layer.add(Container())
+        toolbar.add(Button((PADDING, PADDING, 140, 36), 'Главное меню', self.manager.pop, FONT_SMALL, **style))
+        toolbar.add(Button((PADDING + 156, PADDING, 160, 36), 'Экспорт в CSV', self.export, FONT_SMALL, **style))
+        toolbar.add(Button((PADDING + 332, PADDING, 36, 36), '<', lambda: self.scroll(-self.window_days), FONT_SMALL, **nav))
+        toolbar.add(Button((PADDING + 380, PADDING, 36, 36), '>', lambda: self.scroll(self.window_days), FONT_SMALL, **nav))
+
+        for i, (range_label, _days) in enumerate(RANGE_OPTIONS):
+            self.range_buttons.append(toolbar.add(Button((PADDING + 432 + i * 80, PADDING, 72, 36), range_label,
+                                                         lambda i=i: self.set_range(i), FONT_SMALL,
+                                                         selected_fill=(70, 110, 80), **style)))
 
     def enter(self, **kwargs):
         self.load_stats()
+        self.layer.update_hover(self.manager.mouse_pos())
+        self.changed()
+
+    def changed(self) -> None:
+        """Содержимое экрана изменилось: полная перерисовка в следующем кадре"""
+        self.full_redraw = True
+        self.manager.request_redraw()
+
+    def export(self) -> None:
+        ok = self.export_csv(EXPORT_PATH)
+        print('Export CSV:', EXPORT_PATH if ok else 'failed')
+
+    def scroll(self, days: int) -> None:
+        """Сдвиг окна графика на days календарных дней в пределах истории"""
+        if not self.window_days:
+            return
+
+        self.window_end = self._clamp_end(self.window_end + timedelta(days=days))
+        self.changed()
 
     def load_stats(self) -> None:
+        store = self.manager.store
+        self.profile_name = store.profile_name() if store else ''
+        self.history_warning = None
+        if store is None:
+            self._aggregate_by_date([])
+            return
+
+        legacy = store.legacy_error() if store.active_profile == DEFAULT_PROFILE else None
+        if legacy:
+            self.history_warning = f'stats.json не перенесён: {legacy}'
+        self._aggregate_by_date(self._guarded(store.iter_sessions(strict=True)))
+
+    def _guarded(self, records: Iterable[Any]) -> Iterator[Any]:
+        """Сессии до повреждённого места; причина обрыва запоминается для показа на экране"""
         try:
-            with open(STATS_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    self.raw_list = data
-                elif isinstance(data, dict) and 'games' in data and isinstance(data['games'], list):
-                    self.raw_list = data['games']
-                else:
-                    self.raw_list = []
-        except FileNotFoundError:
-            self.raw_list = []
-        except Exception:
-            self.raw_list = []
-        self._aggregate_by_date()
-
-    def _aggregate_by_date(self) -> None:
-        by_date = defaultdict(list)
-        for rec in self.raw_list:
-            ts = rec.get('timestamp')
-            dt = _parse_timestamp(ts)
-            if dt is None:
-                continue
-            date_key = dt.strftime('%Y-%m-%d')
-            by_date[date_key].append(rec)
-        ordered = OrderedDict()
-        for date_key in sorted(by_date.keys()):
-            records = by_date[date_key]
-            total_score = sum(int(r.get('score', 0)) for r in records)
-            best_max_focus = max(float(r.get('max_focus', 0.0)) for r in records) if records else 0.0
-            max_time = max(float(r.get('time', 0.0)) for r in records) if records else 0.0
-            avg_time = (sum(float(r.get('time', 0.0)) for r in records) / len(records)) if records else 0.0
-            errors_agg: Dict[str, int] = {}
-            for r in records:
-                errs = r.get('errors') or {}
-                if isinstance(errs, dict):
-                    for k, v in errs.items():
-                        try:
-                            errors_agg[k] = errors_agg.get(k, 0) + int(v)
-                        except Exception:
-                            pass
-            ordered[date_key] = {
-                'total_score': total_score,
-                'best_max_focus': best_max_focus,
-                'max_time': max_time,
-                'avg_time': avg_time,
-                'games_count': len(records),
-                'errors': errors_agg
-            }
+            yield from records
+        except ValueError as exc:
+            self.history_warning = f'История прочитана не полностью: {exc}'
+
+    def _aggregate_by_date(self, records: Iterable[Any]) -> None:
+        ordered, self.overall = aggregate_stream(records)
+        self.records_count = int(self.overall.pop('records'))
         if not ordered:
             today = datetime.utcnow().strftime('%Y-%m-%d')
             ordered[today] = {
@@ -121,42 +279,79 @@ class StatsState(BaseState):
                 'best_max_focus': 0.0,
                 'max_time': 0.0,
                 'avg_time': 0.0,
+                'sum_time': 0.0,
                 'games_count': 0,
                 'errors': {}
             }
         self.date_series = ordered
         self.dates_list = list(ordered.keys())
-        max_off = max(0, len(self.dates_list) - self.window_days)
-        if self.offset > max_off:
-            self.offset = max_off
+        self.index = DailyRangeIndex(self.dates_list, ordered)
+        self._chart_cache.clear()
+        self.window_end = self._clamp_end(self.window_end or date.fromisoformat(self.dates_list[-1]))
+
+    def _clamp_end(self, end: date) -> date:
+        """Правый край окна не дальше последней сессии и не раньше, чем окно покрывает первую"""
+        first, last = date.fromisoformat(self.dates_list[0]), date.fromisoformat(self.dates_list[-1])
+        earliest = min(first + timedelta(days=max(self.window_days - 1, 0)), last)
+        return max(min(end, last), earliest)
+
+    def set_range(self, index: int) -> None:
+        """Смена масштаба с сохранением правого края окна"""
+        self.range_index = index
+        self.window_days = RANGE_OPTIONS[index][1]
+        self.window_end = self._clamp_end(self.window_end or date.fromisoformat(self.dates_list[-1]))
+        self.changed()
+
+    def window_range(self) -> Tuple[str, str]:
+        """Первый и последний календарный день текущего окна"""
+        if not self.window_days:
+            return self.dates_list[0], self.dates_list[-1]
+        end = self.window_end or date.fromisoformat(self.dates_list[-1])
+        return (end - timedelta(days=self.window_days - 1)).isoformat(), end.isoformat()
+
+    def _window_dates(self) -> List[str]:
+        """Даты с сессиями внутри окна"""
+        start, end = self.window_range()
+        return self.dates_list[bisect_left(self.dates_list, start):bisect_right(self.dates_list, end)]
+
+    def toggle_compare(self) -> None:
+        """Запомнить текущее окно как диапазон сравнения или сбросить его"""
+        self.compare_range = None if self.compare_range else self.window_range()
+        self.changed()
+
+    def _chart_series(self, key: str, width: int) -> Tuple[List[float], List[float]]:
+        """
+        Значения метрики в окне, прореженные до ширины графика в пикселях
+        :return: (положения по x в долях ширины, значения)
+        """
+        start, end = self.window_range()
+        cache_key = (key, start, end, width)
+        cached = self._chart_cache.get(cache_key)
+        if cached is None:
+            dates = self._window_dates()
+            vals = [float(self.date_series[d].get(key, 0.0)) for d in dates]
+            # точки стоят по календарю: дни без игр остаются промежутками
+            xs = date_positions(dates, start, end)
+            idx, vals = lttb(vals, max(3, width), xs)
+            if len(self._chart_cache) >= CHART_CACHE_SIZE:
+                self._chart_cache.clear()
+            cached = self._chart_cache[cache_key] = ([xs[i] for i in idx], vals)
+        return cached
 
     def handle_events(self, events):
         for e in events:
             if e.type == pygame.QUIT:
                 self.manager.pop()
 
-            if e.type == pygame.MOUSEBUTTONDOWN:
-                mx, my = e.pos
-                if self.btn_back_rect.collidepoint((mx, my)):
-                    self.manager.pop()
-                    return
-
-                if self.btn_export_rect.collidepoint((mx, my)):
-                    ok = self.export_csv(EXPORT_PATH)
-                    print('Export CSV:', EXPORT_PATH if ok else 'failed')
-                    return
-
-                if self.btn_prev_rect.collidepoint((mx, my)):
-                    self.offset = max(0, self.offset - self.window_days)
-                    return
-
-                if self.btn_next_rect.collidepoint((mx, my)):
-                    self.offset = min(max(0, len(self.dates_list) - self.window_days), self.offset + self.window_days)
-                    return
+            # кнопки панели получают только события под курсором
+            if self.layer.handle_event(e):
+                return
 
+            if e.type == pygame.MOUSEBUTTONDOWN:
                 for i, rect in enumerate(self.metric_rects):
-                    if rect.collidepoint((mx, my)):
+                    if rect.collidepoint(e.pos):
                         self.selected_metric_index = i
+                        self.changed()
                         return
 
             if e.type == pygame.KEYDOWN:
@@ -164,15 +359,33 @@ class StatsState(BaseState):
                     self.manager.pop()
 
                 elif e.key == pygame.K_LEFT:
-                    self.offset = max(0, self.offset - 1)
+                    self.scroll(-1)
 
                 elif e.key == pygame.K_RIGHT:
-                    self.offset = min(max(0, len(self.dates_list) - self.window_days), self.offset + 1)
+                    self.scroll(1)
+
+                elif pygame.K_1 <= e.key < pygame.K_1 + len(RANGE_OPTIONS):
+                    self.set_range(e.key - pygame.K_1)
+
+                elif e.key == pygame.K_c:
+                    self.toggle_compare()
+
+        if self.layer.damaged:
+            self.manager.request_redraw()
 
     def update(self, dt: float):
         pass
 
     def render(self):
+        if not self.full_redraw:
+            # сменилась только подсветка кнопок
+            self.layer.draw(self.manager.screen)
+            return
+
+        self.full_redraw = False
+        for i, button in enumerate(self.range_buttons):
+            button.set_selected(i == self.range_index)
+
         screen = self.manager.screen
         width, height = screen.get_size()
         top_bar_h = 160
@@ -190,37 +403,14 @@ class StatsState(BaseState):
         right_h = metric_h * 2 + spacing_y
         screen.fill((18, 18, 20))
         _ensure_fonts()
-        title = FONT_MAIN.render('Статистика — ингибиторный тренажёр', True, (240, 240, 240))
+        title = FONT_MAIN.render(f'Статистика — ингибиторный тренажёр — {self.profile_name}', True, (240, 240, 240))
         screen.blit(title, (PADDING, PADDING + int((top_bar_h - 48) / 2)))
-        self.btn_back_rect = pygame.Rect(PADDING, PADDING, 140, 36)
-        self.btn_export_rect = pygame.Rect(PADDING + 156, PADDING, 160, 36)
-        self.btn_prev_rect = pygame.Rect(PADDING + 332, PADDING, 36, 36)
-        self.btn_next_rect = pygame.Rect(PADDING + 380, PADDING, 36, 36)
-        pygame.draw.rect(screen, (60, 60, 60), self.btn_back_rect, border_radius=6)
-        screen.blit(FONT_SMALL.render('Главное меню', True, (255, 255, 255)), (self.btn_back_rect.x + 10, self.btn_back_rect.y + 8))
-        pygame.draw.rect(screen, (60, 60, 60), self.btn_export_rect, border_radius=6)
-        screen.blit(FONT_SMALL.render('Экспорт в CSV', True, (255, 255, 255)), (self.btn_export_rect.x + 10, self.btn_export_rect.y + 8))
-        pygame.draw.rect(screen, (80, 80, 80), self.btn_prev_rect, border_radius=6)
-        screen.blit(FONT_SMALL.render('<', True, (255, 255, 255)), (self.btn_prev_rect.x + 11, self.btn_prev_rect.y + 8))
-        pygame.draw.rect(screen, (80, 80, 80), self.btn_next_rect, border_radius=6)
-        screen.blit(FONT_SMALL.render('>', True, (255, 255, 255)), (self.btn_next_rect.x + 11, self.btn_next_rect.y + 8))
-        summary_txt = FONT_SMALL.render(f"Всего записей: {len(self.raw_list)}    Дат: {len(self.dates_list)}", True, (220, 220, 220))
+        self.layer.draw(screen, full=True)
+        summary_txt = FONT_SMALL.render(f"Всего записей: {self.records_count}    Дат: {len(self.dates_list)}", True, (220, 220, 220))
         screen.blit(summary_txt, (left_margin, top_margin - 28))
-        slice_dates = self.dates_list[self.offset:self.offset + self.window_days]
-        metric_series_list = []
-        for key, _label in METRIC_KEYS:
-            vals = []
-            for d in slice_dates:
-                cell = self.date_series.get(d, {})
-                if key == 'total_score':
-                    vals.append(float(cell.get('total_score', 0)))
-                elif key == 'best_max_focus':
-                    vals.append(float(cell.get('best_max_focus', 0.0)))
-                elif key == 'max_time':
-                    vals.append(float(cell.get('max_time', 0.0)))
-                elif key == 'avg_time':
-                    vals.append(float(cell.get('avg_time', 0.0)))
-            metric_series_list.append(vals)
+        if self.history_warning:
+            screen.blit(FONT_SMALL.render(self.history_warning, True, (230, 120, 110)), (left_margin, top_margin - 50))
+        win_start, win_end = self.window_range()
         self.metric_rects = []
         base_x = left_margin
         base_y = top_margin
@@ -238,9 +428,9 @@ class StatsState(BaseState):
                 chart_inner = pygame.Rect(x + 8, y + 32, metric_w - 16, metric_h - 44)
                 pygame.draw.rect(screen, (18, 18, 22), chart_inner)
                 pygame.draw.rect(screen, (60, 60, 66), chart_inner, 1)
-                vals = metric_series_list[idx]
+                xs, vals = self._chart_series(key, chart_inner.w)
                 if vals:
-                    self._draw_series_in_rect(screen, chart_inner, vals)
+                    draw_series_in_rect(screen, chart_inner, vals, xs=xs)
                 last_val = vals[-1] if vals else 0.0
                 screen.blit(FONT_SMALL.render(f'Последн: {round(float(last_val), 2)}', True, (190, 190, 190)), (x + metric_w - 120, y + metric_h - 24))
                 self.metric_rects.append(rect)
@@ -256,64 +446,40 @@ class StatsState(BaseState):
         large_chart = pygame.Rect(right_x + 12, right_y + 44, right_w - 24, right_h - 64)
         pygame.draw.rect(screen, (18, 18, 24), large_chart)
         pygame.draw.rect(screen, (50, 50, 60), large_chart, 1)
-        sel_vals = []
-        for d in slice_dates:
-            cell = self.date_series.get(d, {})
-            if sel_key == 'total_score':
-                sel_vals.append(float(cell.get('total_score', 0)))
-            elif sel_key == 'best_max_focus':
-                sel_vals.append(float(cell.get('best_max_focus', 0.0)))
-            elif sel_key == 'max_time':
-                sel_vals.append(float(cell.get('max_time', 0.0)))
-            elif sel_key == 'avg_time':
-                sel_vals.append(float(cell.get('avg_time', 0.0)))
-        self._draw_series_in_rect(screen, large_chart, sel_vals, fill=True, draw_points=True)
-        if slice_dates:
-            n = min(6, len(slice_dates))
-            step = max(1, len(slice_dates) // n)
-            for i, d in enumerate(slice_dates):
-                if i % step == 0 or i == len(slice_dates) - 1:
-                    px = large_chart.x + int((i / (len(slice_dates) - 1 if len(slice_dates) > 1 else 1)) * (large_chart.w))
-                    lbl = FONT_SMALL.render(d[5:], True, (160, 160, 160))
-                    screen.blit(lbl, (px - 18, large_chart.y + large_chart.h + 6))
+        sel_xs, sel_vals = self._chart_series(sel_key, large_chart.w)
+        draw_series_in_rect(screen, large_chart, sel_vals, fill=True, draw_points=True, xs=sel_xs)
+        # подписи - равномерные календарные отметки окна, а не даты сессий
+        first_day = date.fromisoformat(win_start)
+        span = (date.fromisoformat(win_end) - first_day).days
+        label_from = 5 if span <= 31 else 2
+        ticks = min(6, span + 1)
+        for i in range(ticks):
+            frac = i / (ticks - 1) if ticks > 1 else 0.0
+            d = (first_day + timedelta(days=round(frac * span))).isoformat()
+            px = large_chart.x + int(frac * large_chart.w)
+            lbl = FONT_SMALL.render(d[label_from:], True, (160, 160, 160))
+            screen.blit(lbl, (px - 18, large_chart.y + large_chart.h + 6))
         agg = self._compute_overall_metrics()
         ay = right_y + right_h + 12
-        screen.blit(FONT_SMALL.render(f"Всего записей: {len(self.raw_list)}    Сумма score: {int(agg.get('total_score', 0))}", True, (220, 220, 220)), (right_x, ay))
+        screen.blit(FONT_SMALL.render(f"Всего записей: {self.records_count}    Сумма score: {int(agg.get('total_score', 0))}", True, (220, 220, 220)), (right_x, ay))
         screen.blit(FONT_SMALL.render(f"Макс время: {int(agg.get('max_time', 0))}s   Ср. время: {int(agg.get('avg_time', 0))}s", True, (190, 190, 190)), (right_x, ay + 22))
+        win = self.index.query_dates(win_start, win_end)
+        screen.blit(FONT_SMALL.render(self._range_summary('Окно', win), True, (190, 190, 190)), (right_x, ay + 50))
+        if self.compare_range:
+            cmp = self.index.query_dates(*self.compare_range)
+            label = f'{self.compare_range[0][2:]}—{self.compare_range[1][2:]}'
+            screen.blit(FONT_SMALL.render(self._range_summary(label, cmp), True, (170, 190, 230)), (right_x, ay + 72))
+            delta = f"Разница: score {win['total_score'] - cmp['total_score']:+d}   ср. время {win['avg_time'] - cmp['avg_time']:+.1f}s   фокус {win['best_max_focus'] - cmp['best_max_focus']:+.1f}s"
+            screen.blit(FONT_SMALL.render(delta, True, (170, 190, 230)), (right_x, ay + 94))
+        else:
+            screen.blit(FONT_SMALL.render('C - запомнить окно для сравнения', True, (120, 120, 130)), (right_x, ay + 72))
 
-    def _draw_series_in_rect(self, surface: pygame.Surface, rect: pygame.Rect, values: List[float], fill: bool = False, draw_points: bool = False):
-        if not values:
-            return
-        max_v = max(values) or 1.0
-        min_v = min(values) or 0.0
-        rng = max_v - min_v if (max_v - min_v) > 0 else 1.0
-        n = len(values)
-        points: List[Tuple[int, int]] = []
-        for i, v in enumerate(values):
-            x = rect.x + int((i / (n - 1 if n > 1 else 1)) * rect.w)
-            y_norm = (v - min_v) / rng
-            y = rect.y + rect.h - int(y_norm * rect.h)
-            points.append((x, y))
-        if fill and len(points) >= 2:
-            poly = [(points[0][0], rect.y + rect.h)] + points + [(points[-1][0], rect.y + rect.h)]
-            s = pygame.Surface((rect.w, rect.h), pygame.SRCALPHA)
-            offs = [(px - rect.x, py - rect.y) for px, py in poly]
-            pygame.draw.polygon(s, (80, 160, 120, 80), offs)
-            surface.blit(s, (rect.x, rect.y))
-        if len(points) >= 2:
-            pygame.draw.lines(surface, (120, 200, 140), False, points, 2)
-        if draw_points:
-            for p in points:
-                pygame.draw.circle(surface, (200, 240, 200), p, 4)
+    @staticmethod
+    def _range_summary(label: str, q: Dict[str, float]) -> str:
+        return f"{label}: игр {q['games']}, score {q['total_score']}, макс. время {int(q['max_time'])}s, ср. {int(q['avg_time'])}s, фокус {q['best_max_focus']:.1f}s"
 
     def _compute_overall_metrics(self) -> Dict[str, float]:
-        if not self.raw_list:
-            return {'total_score': 0, 'max_time': 0.0, 'avg_time': 0.0}
-        total_score = sum(int(r.get('score', 0)) for r in self.raw_list)
-        times = [float(r.get('time', 0.0)) for r in self.raw_list if r.get('time') is not None]
-        max_time = max(times) if times else 0.0
-        avg_time = (sum(times) / len(times)) if times else 0.0
-        return {'total_score': total_score, 'max_time': max_time, 'avg_time': avg_time}
+        return self.overall
 
     def export_csv(self, path: str) -> bool:
         try:
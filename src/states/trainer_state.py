@@ -1,6 +1,10 @@
 import pygame
 
+import os, time, uuid
+
+from src.event_log import EventLog
 from src.state import BaseState
+from src.stats_store import STATS_DIR, DEFAULT_PROFILE
 from src.mvc.trainer_model import TrainerModel
 from src.mvc.trainer_view import TrainerView
 from src.mvc.trainer_controller import TrainerController
@@ -18,21 +22,63 @@ class TrainerState(BaseState):
         self.view = None
         self.controller = None
 
-    def enter(self):
+        self.event_log = None
+        # None - музыка ещё не загружалась
+        self.has_music = None
+
+    def prefetch(self):
+        """Конфиги, шрифты, изображения сущностей и музыка - до первого входа"""
         self.screen = self.manager.screen
         self.assets = self.manager.assets
 
-        self.model = TrainerModel(self.assets, self.manager.settings)
-        self.view = TrainerView(self.screen, self.assets, self.model)
-        self.controller = TrainerController(self.model, self.manager)
+        if self.view is None:
+            self.view = TrainerView(self.screen, self.assets, None)
 
-        music_list = self.assets.get_music_list()
-        for music in music_list:
-            pygame.mixer.music.load(self.assets.assets_dir + f'/music/{music}')
+        for is_day in (True, False):
+            for ent in TrainerModel._load_entities(is_day):
+                self.assets.get_scaled_image(ent["image"], (100, 100))
 
-        if music_list:
+        for key in ('background_trainer_day', 'background_trainer_night', 'waves'):
+            self.assets.get_image(key)
+        self.assets.get_scaled_image('exit', (25, 25))
+        self.assets.get_scaled_image('lives', (50, 50))
+
+        if self.has_music is None:
+            music_list = self.assets.get_music_list()
+            if music_list:
+                pygame.mixer.music.load(self.assets.assets_dir + f'/music/{music_list[-1]}')
+            self.has_music = bool(music_list)
+
+    def enter(self):
+        self.prefetch()
+
+        # профиль фиксируется на всю партию: смена в меню или на другой станции её не касается
+        profile = self.manager.store.active_profile if self.manager.store else DEFAULT_PROFILE
+
+        if self.manager.settings.get('event_log', True):
+            # суффикс отличает сессии, начатые в одну секунду (в том числе на другой станции с общим каталогом)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.evlog"
+            self.event_log = EventLog(os.path.join(STATS_DIR, 'events', profile, name))
+
+        if self.model is None:
+            self.model = TrainerModel(self.assets, self.manager.settings, self.manager.store, self.event_log, profile_id=profile)
+            self.view.model = self.model
+            self.view.reset()
+            self.controller = TrainerController(self.model, self.manager)
+        else:
+            self.model.event_log = self.event_log
+            self.model.profile_id = profile
+            self.model.reset()
+            self.view.reset()
+            self.controller.start()
+
+        if self.has_music:
             pygame.mixer.music.play(loops=True)
 
+    def exit(self):
+        if self.event_log:
+            self.event_log.close()
+            self.event_log = None
 
     def handle_events(self, events):
         for e in events:
@@ -0,0 +1,63 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List
+
+
+class DailyRangeIndex:
+    """
+    Запросы по произвольному диапазону дней: суммы через префиксные суммы (O(1)),
+    максимумы через sparse table (O(1) на запрос, O(n log n) на построение)
+    """
+    def __init__(self, dates: List[str], series: Dict[str, Dict[str, Any]]) -> None:
+        self.dates = dates
+        n = len(dates)
+
+        self.games = [0] * (n + 1)
+        self.score = [0] * (n + 1)
+        self.time = [0.0] * (n + 1)
+        for i, d in enumerate(dates):
+            cell = series[d]
+            self.games[i + 1] = self.games[i] + int(cell.get('games_count', 0))
+            self.score[i + 1] = self.score[i] + int(cell.get('total_score', 0))
+            self.time[i + 1] = self.time[i] + float(cell.get('sum_time', 0.0))
+
+        self.max_time = self._sparse([float(series[d].get('max_time', 0.0)) for d in dates])
+        self.max_focus = self._sparse([float(series[d].get('best_max_focus', 0.0)) for d in dates])
+
+    @staticmethod
+    def _sparse(values: List[float]) -> List[List[float]]:
+        table = [values]
+        k = 1
+        while (1 << k) <= len(values):
+            prev, half = table[-1], 1 << (k - 1)
+            table.append([max(prev[i], prev[i + half]) for i in range(len(values) - (1 << k) + 1)])
+            k += 1
+
+        return table
+
+    @staticmethod
+    def _range_max(table: List[List[float]], i: int, j: int) -> float:
+        k = (j - i).bit_length() - 1
+        return max(table[k][i], table[k][j - (1 << k)])
+
+    def query(self, i: int, j: int) -> Dict[str, float]:
+        """
+        Показатели за дни с индексами [i, j)
+        :return: число дней и игр, сумма очков, макс./сред. время, макс. фокус
+        """
+        i, j = max(0, i), min(len(self.dates), j)
+        if i >= j:
+            return {'days': 0, 'games': 0, 'total_score': 0, 'max_time': 0.0, 'avg_time': 0.0, 'best_max_focus': 0.0}
+
+        games = self.games[j] - self.games[i]
+        return {
+            'days': j - i,
+            'games': games,
+            'total_score': self.score[j] - self.score[i],
+            'max_time': self._range_max(self.max_time, i, j),
+            'avg_time': (self.time[j] - self.time[i]) / games if games else 0.0,
+            'best_max_focus': self._range_max(self.max_focus, i, j)
+        }
+
+    def query_dates(self, date_from: str, date_to: str) -> Dict[str, float]:
+        """Показатели за даты 'YYYY-MM-DD' от date_from до date_to включительно (O(log n))"""
+        return self.query(bisect_left(self.dates, date_from), bisect_right(self.dates, date_to))
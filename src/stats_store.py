@@ -0,0 +1,487 @@
+import itertools, json, os, time
+
+from datetime import datetime
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+
+STATS_DIR = os.path.join('data', 'stats')
+LEGACY_STATS_PATH = os.path.join(STATS_DIR, 'stats.json')
+PROFILES_DIR = os.path.join(STATS_DIR, 'profiles')
+DEFAULT_PROFILE = 'default'
+
+
+class FileLock:
+    """
+    Межпроцессная эксклюзивная блокировка через отдельный .lock файл.
+    Работает и на общих сетевых каталогах (lockf / msvcrt.locking)
+    """
+    def __init__(self, path: str, timeout: float = 10.0) -> None:
+        self.path = path + '.lock'
+        self.timeout = timeout
+        self._f = None
+
+    def _try_lock(self) -> bool:
+        try:
+            if os.name == 'nt':
+                self._f.seek(0)
+                msvcrt.locking(self._f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.lockf(self._f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+
+        except OSError:
+            return False
+
+    def __enter__(self) -> 'FileLock':
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._f = open(self.path, 'a+b')
+
+        deadline = time.monotonic() + self.timeout
+        while not self._try_lock():
+            if time.monotonic() > deadline:
+                self._f.close()
+                self._f = None
+                raise TimeoutError(f'Не удалось заблокировать {self.path}')
+            time.sleep(0.05)
+
+        return self
+
+    def __exit__(self, *exc) -> None:
+        try:
+            if os.name == 'nt':
+                self._f.seek(0)
+                msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.lockf(self._f.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._f.close()
+            self._f = None
+
+
+def parse_timestamp(ts_val: Any) -> datetime | None:
+    if ts_val is None:
+        return None
+    # быстрый путь: 'YYYY-MM-DD HH:MM:SS', 'YYYY-MM-DDTHH:MM:SS' и 'YYYY-MM-DD'
+    if isinstance(ts_val, str) and len(ts_val) in (10, 19):
+        try:
+            dt = datetime.fromisoformat(ts_val)
+            if dt.tzinfo is None:
+                return dt
+        except ValueError:
+            pass
+    if isinstance(ts_val, (int, float)):
+        try:
+            return datetime.utcfromtimestamp(int(ts_val))
+        except Exception:
+            return None
+    if isinstance(ts_val, str):
+        formats = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d']
+        for fmt in formats:
+            try:
+                return datetime.strptime(ts_val, fmt)
+            except Exception:
+                continue
+    return None
+
+
+def date_key(ts_val: Any) -> str | None:
+    """Дата 'YYYY-MM-DD' из метки времени сессии"""
+    dt = parse_timestamp(ts_val)
+    return None if dt is None else dt.date().isoformat()
+
+
+def iter_sessions_json(path: str, chunk_size: int = 1 << 16, max_record: int = 1 << 24, strict: bool = False) -> Iterator[Any]:
+    """
+    Потоковое чтение файла статистики (список или {'games': [...]}):
+    элементы массива разбираются по одному, в памяти только текущий блок.
+    На повреждённом месте чтение останавливается
+    :param strict: вместо тихой остановки бросить ValueError (для тех, кто потом пишет в файл)
+    """
+    decoder = json.JSONDecoder()
+
+    try:
+        f = open(path, 'r', encoding='utf-8')
+    except OSError:
+        return
+
+    with f:
+        buf = ''
+        pos = 0
+        # символов файла до начала buf
+        base = 0
+        eof = False
+        count = 0
+
+        def more() -> bool:
+            nonlocal buf, pos, base, eof
+            if eof or len(buf) - pos > max_record:
+                return False
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            base += pos
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def peek() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not more():
+                    return ''
+
+        def decode() -> Tuple[bool, Any]:
+            nonlocal pos
+            while True:
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                    # значение у края блока может быть обрезано (например, число)
+                    if end < len(buf) or eof:
+                        pos = end
+                        return True, obj
+                except json.JSONDecodeError:
+                    if eof:
+                        return False, None
+                if not more() and not eof:
+                    return False, None
+
+        def fail(reason: str) -> None:
+            if strict:
+                raise ValueError(f'{path}: {reason} (символ {base + pos}, прочитано записей: {count})')
+
+        ch = peek()
+        if ch == '{':
+            # устаревший формат: ищем ключ 'games'
+            pos += 1
+            while True:
+                ch = peek()
+                if ch == ',':
+                    pos += 1
+                    continue
+                if ch != '"':
+                    return fail('нет списка games' if ch == '}' else 'повреждённый объект')
+                ok, key = decode()
+                if not ok or peek() != ':':
+                    return fail('повреждённый объект')
+                pos += 1
+                if peek() == '[' and key == 'games':
+                    break
+                ok, _ = decode()
+                if not ok:
+                    return fail('повреждённый объект')
+        elif ch != '[':
+            return fail('пустой файл' if ch == '' else 'не массив')
+
+        pos += 1
+        if peek() == ']':
+            return
+        while True:
+            # raw_decode не пропускает пробелы перед значением
+            peek()
+            ok, obj = decode()
+            if not ok:
+                return fail('повреждённая запись')
+            yield obj
+            count += 1
+            ch = peek()
+            if ch == ',':
+                pos += 1
+            elif ch == ']':
+                return
+            else:
+                return fail('файл обрезан' if ch == '' else 'ожидалась , или ]')
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    except Exception:
+        return default
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Запись через временный файл и os.replace: читатели не видят половину файла"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp, path)
+
+
+def write_sessions_atomic(path: str, sessions: Iterable[Any]) -> int:
+    """
+    Запись массива сессий по одной, без сборки списка в памяти (через временный файл)
+    :return: число записанных сессий
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    count = 0
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for rec in sessions:
+                f.write(',\n' if count else '\n')
+                f.write(json.dumps(rec, ensure_ascii=False))
+                count += 1
+            f.write('\n]')
+            f.flush()
+            os.fsync(f.fileno())
+
+    except BaseException:
+        # источник оборвался (например, strict-чтение повреждённого файла): целевой файл не трогаем
+        os.remove(tmp)
+        raise
+
+    os.replace(tmp, path)
+    return count
+
+
+def _last_byte(f, end: int) -> Tuple[int, bytes]:
+    """Последний непробельный байт файла до позиции end: (позиция, байт) или (-1, b'')"""
+    while end > 0:
+        start = max(0, end - 4096)
+        f.seek(start)
+        block = f.read(end - start).rstrip()
+        if block:
+            return start + len(block) - 1, block[-1:]
+        end = start
+
+    return -1, b''
+
+
+def append_json_array(path: str, items: List[Any]) -> None:
+    """
+    Дописать элементы в конец JSON-массива на месте: читается и переписывается
+    только хвост файла начиная с закрывающей ']'
+    :raises ValueError: файл не оканчивается массивом (повреждён или обрезан)
+    """
+    if not items:
+        return
+
+    if not os.path.exists(path):
+        write_sessions_atomic(path, items)
+        return
+
+    with open(path, 'r+b') as f:
+        close_pos, ch = _last_byte(f, f.seek(0, os.SEEK_END))
+        if ch != b']':
+            raise ValueError(f'{path}: нет закрывающей скобки массива')
+
+        _, prev = _last_byte(f, close_pos)
+        if not prev:
+            raise ValueError(f'{path}: нет открывающей скобки массива')
+
+        body = ',\n'.join(json.dumps(rec, ensure_ascii=False) for rec in items)
+        f.seek(close_pos)
+        f.write((('\n' if prev == b'[' else ',\n') + body + '\n]').encode('utf-8'))
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def sessions_from_json(data: Any) -> List[Dict[str, Any]]:
+    """Список сессий из содержимого файла статистики (список или {'games': [...]})"""
+    if isinstance(data, list):
+        return data
+
+    if isinstance(data, dict) and isinstance(data.get('games'), list):
+        return data['games']
+
+    return []
+
+
+class StatsStore:
+    """
+    Хранилище статистики по профилям игроков: один шард на профиль
+    (profiles/<id>.json) и небольшой индекс profiles/index.json.
+    Выбранный профиль принадлежит экземпляру (станции), в индексе хранится
+    только профиль по умолчанию для новых запусков
+    """
+    def __init__(self, root: str = PROFILES_DIR) -> None:
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+
+        self._ensure_index()
+        self.active_profile = self.default_profile()
+
+    def _migration_done(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+
+        # нечитаемый индекс не пересоздаётся: в нём список профилей
+        index = read_json(self.index_path, None)
+        return not (isinstance(index, dict) and 'legacy_error' in index)
+
+    def _ensure_index(self) -> None:
+        if self._migration_done():
+            return
+
+        with FileLock(self.index_path):
+            if self._migration_done():
+                return
+
+            index = read_json(self.index_path, None)
+            retry = isinstance(index, dict) and 'legacy_error' in index
+            if not retry:
+                index = {'active': DEFAULT_PROFILE, 'profiles': {DEFAULT_PROFILE: {'name': 'Игрок'}}}
+            index.pop('legacy_error', None)
+
+            # перенос общего stats.json в профиль по умолчанию
+            default_shard = self.shard_path(DEFAULT_PROFILE)
+            if os.path.exists(LEGACY_STATS_PATH) and (retry or not os.path.exists(default_shard)):
+                try:
+                    with FileLock(default_shard):
+                        # при повторе к перенесённым сессиям добавляются сыгранные после неудачной попытки
+                        write_sessions_atomic(default_shard, itertools.chain(
+                            iter_sessions_json(LEGACY_STATS_PATH, strict=True),
+                            iter_sessions_json(default_shard, strict=True)
+                        ))
+                except ValueError as exc:
+                    # повреждённый stats.json не переносится частично: попытка повторится при следующем запуске
+                    index['legacy_error'] = str(exc)
+
+            write_json_atomic(self.index_path, index)
+
+    def legacy_error(self) -> str | None:
+        """Причина, по которой старый stats.json ещё не перенесён"""
+        index = read_json(self.index_path, None)
+        return index.get('legacy_error') if isinstance(index, dict) else None
+
+    def _read_index(self) -> Dict[str, Any]:
+        index = read_json(self.index_path, None)
+        if not isinstance(index, dict) or not isinstance(index.get('profiles'), dict):
+            index = {'active': DEFAULT_PROFILE, 'profiles': {DEFAULT_PROFILE: {'name': 'Игрок'}}}
+
+        return index
+
+    def shard_path(self, profile_id: str) -> str:
+        return os.path.join(self.root, f'{profile_id}.json')
+
+    def profiles(self) -> List[Tuple[str, str]]:
+        """
+        Список профилей
+        :return: пары (id, имя)
+        """
+        index = self._read_index()
+        return [(pid, p.get('name', pid)) for pid, p in index['profiles'].items()]
+
+    def default_profile(self) -> str:
+        """Профиль, с которого начинает новый запуск"""
+        index = self._read_index()
+        active = index.get('active')
+
+        return active if active in index['profiles'] else DEFAULT_PROFILE
+
+    def profile_name(self, profile_id: str | None = None) -> str:
+        profile_id = profile_id or self.active_profile
+        return dict(self.profiles()).get(profile_id, profile_id)
+
+    def set_active(self, profile_id: str) -> None:
+        """Выбор профиля только для этого экземпляра: другие станции не затрагиваются"""
+        if profile_id not in self._read_index()['profiles']:
+            raise KeyError(profile_id)
+
+        self.active_profile = profile_id
+
+    def set_default(self, profile_id: str) -> None:
+        """Профиль по умолчанию для следующих запусков"""
+        with FileLock(self.index_path):
+            index = self._read_index()
+            if profile_id not in index['profiles']:
+                raise KeyError(profile_id)
+
+            index['active'] = profile_id
+            write_json_atomic(self.index_path, index)
+
+    def create_profile(self, name: str) -> str:
+        """
+        Создание профиля
+        :param name: отображаемое имя
+        :return: id нового профиля
+        """
+        with FileLock(self.index_path):
+            index = self._read_index()
+
+            n = len(index['profiles'])
+            while f'p{n:04d}' in index['profiles']:
+                n += 1
+
+            profile_id = f'p{n:04d}'
+            index['profiles'][profile_id] = {'name': name}
+            write_json_atomic(self.index_path, index)
+
+        return profile_id
+
+    def iter_sessions(self, profile_id: str | None = None, strict: bool = False) -> Iterator[Any]:
+        """Потоковое чтение шарда профиля без загрузки файла целиком"""
+        return iter_sessions_json(self.shard_path(profile_id or self.active_profile), strict=strict)
+
+    def pending_path(self, profile_id: str) -> str:
+        return os.path.join(self.root, 'pending', f'{profile_id}.jsonl')
+
+    def spool_session(self, entry: Dict[str, Any], profile_id: str | None = None) -> str:
+        """
+        Отложить сессию, которую не удалось записать в шард: она будет дописана
+        при следующем успешном append_session этого профиля
+        :return: путь к файлу отложенных сессий
+        """
+        path = self.pending_path(profile_id or self.active_profile)
+        with FileLock(path):
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+        return path
+
+    def _read_pending(self, path: str) -> List[Dict[str, Any]]:
+        entries = []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+
+        return entries
+
+    def append_session(self, entry: Dict[str, Any], profile_id: str | None = None, timeout: float = 10.0) -> None:
+        """
+        Дописать сессию (и ранее отложенные) в шард профиля под блокировкой
+        :raises TimeoutError: шард занят дольше timeout
+        :raises ValueError: шард повреждён и не перезаписывается
+        """
+        profile_id = profile_id or self.active_profile
+        path = self.shard_path(profile_id)
+        pending = self.pending_path(profile_id)
+
+        # шард не читается целиком: новые записи вставляются перед закрывающей ']'
+        with FileLock(path, timeout):
+            if not os.path.exists(pending):
+                append_json_array(path, [entry])
+                return
+
+            with FileLock(pending, timeout):
+                append_json_array(path, self._read_pending(pending) + [entry])
+                os.remove(pending)
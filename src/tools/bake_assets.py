@@ -0,0 +1,33 @@
+"""
+Предварительное заполнение кэша изображений (data/cache/assets).
+
+    python -m src.tools.bake_assets
+
+Кэш привязан к пиксельному формату дисплея, поэтому запускать стоит
+на самой станции; при другом формате игра перезапечёт изображения сама.
+"""
+import argparse, time
+
+import pygame
+
+from src.assets import Assets, CACHE_DIR
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Запекание изображений в кэш')
+    parser.add_argument('--assets', default='assets')
+    parser.add_argument('--cache', default=CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+    started = time.perf_counter()
+    keys = Assets(screen, args.assets, args.cache).bake_all()
+    print(f'Изображений: {len(keys)} за {time.perf_counter() - started:.2f} c -> {args.cache}')
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
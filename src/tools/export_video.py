@@ -0,0 +1,178 @@
+"""
+Покадровый экспорт записанной сессии тренажёра без окна и GPU.
+
+    python -m src.tools.export_video data/stats/events/default/20240101-100000.evlog --out session.mp4
+    python -m src.tools.export_video session.evlog --out frames/%06d.png
+    python -m src.tools.export_video session.evlog --raw | ffmpeg -f rawvideo -pix_fmt bgr0 -s 1280x720 -r 60 -i - out.mkv
+
+Сессия восстанавливается по журналу событий (src/event_log.py) с фиксированным
+шагом времени и рисуется TrainerView в поверхность вне экрана. Кадры передаются
+кодировщику как сырые пиксели прямо из буфера поверхности, без image.save.
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse, subprocess, sys, time
+
+import pygame
+
+from typing import Dict, List
+
+from src.assets import Assets
+from src.event_log import read_events, EV_TARGET, EV_SPAWN, EV_HIT, EV_ERROR, EV_EVICT, EV_DAYNIGHT, EV_GAME_OVER
+from src.mvc.trainer_model import TrainerModel, Entity
+from src.mvc.trainer_view import TrainerView
+
+
+FRAME_W = 1280
+FRAME_H = 720
+
+
+class SessionReplay:
+    """Применение событий журнала к TrainerModel вместо случайной генерации"""
+    def __init__(self, model: TrainerModel, assets: Assets, names: List[str]) -> None:
+        self.model = model
+        self.assets = assets
+        self.names = names
+
+        # имя изображения -> описание сущности из конфигов дня и ночи
+        self.entity_data: Dict[str, dict] = {}
+        for is_day in (False, True):
+            for ent in TrainerModel._load_entities(is_day):
+                self.entity_data[ent["image"]] = ent
+
+    def _data(self, name_id: int) -> dict:
+        name = self.names[name_id]
+        return self.entity_data.get(name, {"name": name, "image": name})
+
+    def _remove(self, entity_id: int) -> None:
+        self.model.entities = [e for e in self.model.entities if e.id != entity_id]
+
+    def apply(self, ev: tuple) -> None:
+        t, kind, ent, a, b, c, d = ev
+        model = self.model
+
+        if kind == EV_TARGET:
+            model.current_target = self._data(a)
+            model.current_target_key = b
+
+        elif kind == EV_SPAWN:
+            model.entities.append(Entity(self._data(a), (b, c), ent, t, d / 1000))
+
+        elif kind == EV_HIT:
+            model.score += 1
+            self._remove(ent)
+
+        elif kind == EV_ERROR:
+            model.lives -= 1
+
+        elif kind == EV_EVICT:
+            if b:
+                model.lives -= 1
+            self._remove(ent)
+
+        elif kind == EV_DAYNIGHT:
+            model.day = bool(a)
+            self.assets.background_image = self.assets.get_image('background_trainer_day' if model.day else 'background_trainer_night')
+
+        elif kind == EV_GAME_OVER:
+            model.game_running = False
+
+
+def pixel_format(surface: pygame.Surface) -> str:
+    """Имя формата пикселей поверхности для ffmpeg (-pix_fmt)"""
+    masks = surface.get_masks()[:3]
+    if sys.byteorder == 'little':
+        return 'bgr0' if masks == (0xFF0000, 0xFF00, 0xFF) else 'rgb0'
+
+    return '0rgb' if masks == (0xFF0000, 0xFF00, 0xFF) else '0bgr'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Экспорт записанной сессии в видео')
+    parser.add_argument('log', help='файл журнала .evlog')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--out', help='файл видео или шаблон PNG-последовательности (frames/%%06d.png) для ffmpeg')
+    target.add_argument('--raw', action='store_true', help='сырые кадры в stdout')
+    parser.add_argument('--fps', type=int, default=60)
+    parser.add_argument('--tail', type=float, default=1.0, help='секунд после окончания игры')
+    parser.add_argument('--ffmpeg', default='ffmpeg')
+    args = parser.parse_args(argv)
+
+    names, events = read_events(args.log)
+
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((1, 1))
+
+    screen = pygame.Surface((FRAME_W, FRAME_H), 0, 32)
+    if screen.get_pitch() != FRAME_W * 4:
+        raise SystemExit('Строки поверхности выровнены с запасом: сырой буфер не совпадает с кадром')
+
+    assets = Assets(screen)
+    model = TrainerModel(assets, {})
+    model.entities = []
+    view = TrainerView(screen, assets, model)
+    view.reset()
+    replay = SessionReplay(model, assets, names)
+
+    pix_fmt = pixel_format(screen)
+    if args.raw:
+        sink = sys.stdout.buffer
+        proc = None
+        print(f'-f rawvideo -pix_fmt {pix_fmt} -s {FRAME_W}x{FRAME_H} -r {args.fps}', file=sys.stderr)
+    else:
+        out_dir = os.path.dirname(args.out)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        proc = subprocess.Popen([
+            args.ffmpeg, '-loglevel', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', pix_fmt, '-s', f'{FRAME_W}x{FRAME_H}', '-r', str(args.fps), '-i', '-',
+            args.out
+        ], stdin=subprocess.PIPE)
+        sink = proc.stdin
+
+    dt = 1.0 / args.fps
+    end_time = (events[-1][0] if events else 0.0) + args.tail
+    pos = 0
+    frames = 0
+    started = time.perf_counter()
+
+    try:
+        while model.current_game_time <= end_time:
+            for entity in model.entities:
+                entity.update()
+
+            while pos < len(events) and events[pos][0] <= model.current_game_time + 1e-9:
+                replay.apply(events[pos])
+                pos += 1
+
+            if model.current_target is not None:
+                view.render()
+
+                # буфер поверхности уходит в канал без промежуточной копии в Python
+                buf = screen.get_buffer()
+                sink.write(buf)
+                del buf
+
+                frames += 1
+
+            model.current_game_time += dt
+    finally:
+        if proc:
+            proc.stdin.close()
+            proc.wait()
+        else:
+            sink.flush()
+
+    elapsed = time.perf_counter() - started
+    print(f'Кадров: {frames} за {elapsed:.1f} c ({frames / max(elapsed, 1e-9):.0f} кадров/c)', file=sys.stderr)
+
+    if proc and proc.returncode:
+        raise SystemExit(proc.returncode)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Сбор статистики со многих станций в одно хранилище.
+
+    python -m src.tools.ingest_stats collected/ --out data/stats/merged.json
+    python -m src.tools.ingest_stats collected/ --profile p0001 --rejects rejects.jsonl
+
+Файлы ищутся рекурсивно (*.json), разбираются в пуле процессов,
+сессии дедуплицируются по (timestamp, score, time) и сортируются по времени.
+При --profile записи шарда остаются как есть, дописываются только новые сессии;
+повреждённый шард не перезаписывается.
+"""
+import argparse, json, os, time
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from src.stats_store import FileLock, StatsStore, append_json_array, iter_sessions_json, parse_timestamp, sessions_from_json, write_sessions_atomic
+
+
+TS_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def parse_timestamp_lenient(ts_val: Any) -> datetime | None:
+    """
+    parse_timestamp плюс форматы, которые встречаются на старых станциях:
+    доли секунды, часовой пояс, 'Z', epoch строкой или в миллисекундах
+    """
+    dt = parse_timestamp(ts_val)
+    if dt is not None:
+        return dt
+
+    if isinstance(ts_val, (int, float)) or (isinstance(ts_val, str) and ts_val.strip().replace('.', '', 1).isdigit()):
+        try:
+            val = float(ts_val)
+            if val > 1e11:
+                val /= 1000.0
+            return datetime.utcfromtimestamp(int(val))
+        except Exception:
+            return None
+
+    if isinstance(ts_val, str):
+        s = ts_val.strip()
+        if s.endswith('Z'):
+            s = s[:-1] + '+00:00'
+        try:
+            dt = datetime.fromisoformat(s)
+        except ValueError:
+            return None
+
+        return dt.replace(tzinfo=None, microsecond=0)
+
+    return None
+
+
+def normalize_session(rec: Any) -> Tuple[Dict[str, Any] | None, str]:
+    """
+    Приведение записи к формату TrainerModel.game_over
+    :return: (сессия, '') или (None, причина отказа)
+    """
+    if not isinstance(rec, dict):
+        return None, 'not_object'
+
+    dt = parse_timestamp_lenient(rec.get('timestamp'))
+    if dt is None:
+        return None, 'bad_timestamp'
+
+    try:
+        score = int(rec.get('score') or 0)
+        max_focus = float(rec.get('max_focus') or 0.0)
+        game_time = round(float(rec.get('time') or 0.0), 2)
+    except (TypeError, ValueError):
+        return None, 'bad_number'
+
+    errors = {}
+    if isinstance(rec.get('errors'), dict):
+        for k, v in rec['errors'].items():
+            try:
+                errors[str(k)] = int(v)
+            except (TypeError, ValueError):
+                continue
+
+    session = {
+        'score': score,
+        'max_focus': max_focus,
+        'errors': errors,
+        'time': game_time,
+        'timestamp': dt.strftime(TS_FORMAT)
+    }
+    if isinstance(rec.get('event_log'), str):
+        session['event_log'] = rec['event_log']
+
+    return session, ''
+
+
+def fingerprint(session: Dict[str, Any]) -> tuple:
+    return session['timestamp'], session['score'], session['time']
+
+
+def ingest_file(path: str) -> Dict[str, Any]:
+    """Разбор одного файла (выполняется в процессе пула)"""
+    result = {'path': path, 'size': 0, 'sessions': [], 'rejects': [], 'error': None}
+
+    try:
+        result['size'] = os.path.getsize(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+    except Exception as exc:
+        result['error'] = f'{type(exc).__name__}: {exc}'
+        return result
+
+    for i, rec in enumerate(sessions_from_json(data)):
+        session, reason = normalize_session(rec)
+        if session is None:
+            result['rejects'].append({'path': path, 'index': i, 'reason': reason, 'record': rec})
+        else:
+            result['sessions'].append(session)
+
+    return result
+
+
+def find_stats_files(root: str) -> List[str]:
+    paths = []
+    for dirpath, _dirs, files in os.walk(root):
+        for name in files:
+            if name.endswith('.json') and name != 'index.json':
+                paths.append(os.path.join(dirpath, name))
+
+    return sorted(paths)
+
+
+def new_sessions(existing: Iterable[Any], incoming: Dict[tuple, Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Сессии, которых ещё нет в шарде. Записи шарда не меняются и не удаляются,
+    их нормализованный вид нужен только для поиска дубликатов
+    :return: (новые сессии по времени, число записей в шарде)
+    """
+    known = set()
+    count = 0
+    for rec in existing:
+        count += 1
+        session, _ = normalize_session(rec)
+        if session is not None:
+            known.add(fingerprint(session))
+
+    added = [s for key, s in incoming.items() if key not in known]
+    added.sort(key=lambda s: s['timestamp'])
+
+    return added, count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Слияние файлов статистики со станций')
+    parser.add_argument('root', help='каталог с собранными stats.json')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--out', help='путь итогового файла')
+    target.add_argument('--profile', help='дописать в шард профиля')
+    parser.add_argument('--rejects', help='записать отклонённые записи (jsonl)')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    store = None
+    if args.profile:
+        store = StatsStore()
+        if args.profile not in dict(store.profiles()):
+            raise SystemExit(f'Нет профиля {args.profile} (создайте: python -m src.tools.profiles add)')
+
+    paths = find_stats_files(args.root)
+    started = time.perf_counter()
+
+    sessions: Dict[tuple, Dict[str, Any]] = {}
+    reasons = Counter()
+    total_records = duplicates = total_bytes = 0
+    failed_files = []
+
+    rejects_f = open(args.rejects, 'w', encoding='utf-8') if args.rejects else None
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for res in pool.map(ingest_file, paths, chunksize=8):
+                total_bytes += res['size']
+                if res['error']:
+                    failed_files.append((res['path'], res['error']))
+                    continue
+
+                total_records += len(res['sessions']) + len(res['rejects'])
+                for rej in res['rejects']:
+                    reasons[rej['reason']] += 1
+                    if rejects_f:
+                        rejects_f.write(json.dumps(rej, ensure_ascii=False, default=str) + '\n')
+
+                for s in res['sessions']:
+                    key = fingerprint(s)
+                    if key in sessions:
+                        duplicates += 1
+                    else:
+                        sessions[key] = s
+    finally:
+        if rejects_f:
+            rejects_f.close()
+
+    added = list(sessions.values())
+    if store is not None:
+        path = store.shard_path(args.profile)
+        with FileLock(path):
+            try:
+                # шард читается целиком и строго: в повреждённый файл ничего не дописывается
+                added, shard_count = new_sessions(iter_sessions_json(path, strict=True), sessions)
+                append_json_array(path, added)
+            except ValueError as exc:
+                raise SystemExit(f'Шард не читается ({exc}), запись отменена')
+        total = shard_count + len(added)
+    else:
+        path = args.out
+        total = write_sessions_atomic(path, sorted(added, key=lambda s: s['timestamp']))
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f'Файлов: {len(paths)} (ошибок чтения: {len(failed_files)}), {total_bytes / 1e6:.1f} МБ')
+    print(f'Записей: {total_records}, уникальных: {len(sessions)}, дубликатов: {duplicates}, отклонено: {sum(reasons.values())}')
+    if store is not None:
+        print(f'Уже были в шарде: {len(sessions) - len(added)}, добавлено: {len(added)}')
+    for reason, cnt in reasons.most_common():
+        print(f'  {reason}: {cnt}')
+    for p, err in failed_files:
+        print(f'  не прочитан {p}: {err}')
+    print(f'Время: {elapsed:.2f} c, {len(paths) / elapsed:.1f} файлов/c, {total_records / elapsed:.0f} записей/c')
+    print(f'Итог: {total} сессий -> {path}')
+
+
+if __name__ == '__main__':
+    main()
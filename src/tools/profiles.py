@@ -0,0 +1,48 @@
+"""
+Управление профилями игроков.
+
+    python -m src.tools.profiles list
+    python -m src.tools.profiles add "Иванов И."
+    python -m src.tools.profiles use p0001
+
+Профиль, выбранный командой use, действует для следующих запусков тренажёра;
+уже запущенные станции продолжают работать со своим профилем.
+"""
+import argparse
+
+from src.stats_store import StatsStore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Профили игроков')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    sub.add_parser('list', help='список профилей')
+
+    p_add = sub.add_parser('add', help='создать профиль')
+    p_add.add_argument('name')
+    p_add.add_argument('--use', action='store_true', help='сразу сделать профилем по умолчанию')
+
+    p_use = sub.add_parser('use', help='выбрать профиль по умолчанию для новых запусков')
+    p_use.add_argument('profile_id')
+
+    args = parser.parse_args(argv)
+    store = StatsStore()
+
+    if args.cmd == 'list':
+        active = store.default_profile()
+        for pid, name in store.profiles():
+            print(f"{'*' if pid == active else ' '} {pid}\t{name}")
+
+    elif args.cmd == 'add':
+        pid = store.create_profile(args.name)
+        if args.use:
+            store.set_default(pid)
+        print(pid)
+
+    elif args.cmd == 'use':
+        store.set_default(args.profile_id)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Пакетная генерация PNG-отчётов по статистике без окна (SDL dummy).
+
+    python -m src.tools.render_reports --out reports/
+    python -m src.tools.render_reports --profiles p0001 p0002 --from 2024-01-01 --to 2024-03-31
+
+Графики рисуются тем же кодом, что и экран статистики (draw_series_in_rect).
+Профили распределяются по пулу процессов. Файл отчёта называется
+<профиль>_<с>_<по>.png (all вместо незаданной границы), так что отчёты
+за разные периоды в одном каталоге не перезаписывают друг друга.
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse, time
+
+import pygame
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from src.stats_store import StatsStore
+from src.states import stats_state
+from src.states.stats_state import METRIC_KEYS, PADDING, aggregate_by_date, date_positions, draw_series_in_rect
+
+
+REPORT_W = 1280
+REPORT_H = 720
+
+
+def _init_worker() -> None:
+    pygame.display.init()
+    pygame.font.init()
+
+
+def render_report(surface: pygame.Surface, title: str, series: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Отчёт: заголовок, сводка и четыре графика метрик по дням
+    :param series: агрегаты по датам (aggregate_by_date)
+    """
+    stats_state._ensure_fonts()
+    font_main, font_small = stats_state.FONT_MAIN, stats_state.FONT_SMALL
+
+    width, height = surface.get_size()
+    surface.fill((18, 18, 20))
+    surface.blit(font_main.render(title, True, (240, 240, 240)), (PADDING, PADDING))
+
+    dates = list(series.keys())
+    games = sum(c['games_count'] for c in series.values())
+    total_score = sum(c['total_score'] for c in series.values())
+    summary = f'Дней: {len(dates)}    Игр: {games}    Сумма score: {total_score}'
+    surface.blit(font_small.render(summary, True, (220, 220, 220)), (PADDING, PADDING + 30))
+
+    # точки по календарю: промежутки без игр видны на графике
+    xs = date_positions(dates, dates[0], dates[-1]) if dates else None
+
+    top = PADDING + 64
+    cell_w = (width - PADDING * 3) // 2
+    cell_h = (height - top - PADDING * 2) // 2
+    for idx, (key, label) in enumerate(METRIC_KEYS):
+        x = PADDING + (idx % 2) * (cell_w + PADDING)
+        y = top + (idx // 2) * (cell_h + PADDING)
+        rect = pygame.Rect(x, y, cell_w, cell_h)
+        pygame.draw.rect(surface, (30, 30, 36), rect)
+        surface.blit(font_small.render(label, True, (220, 220, 220)), (x + 8, y + 6))
+
+        chart = pygame.Rect(x + 8, y + 32, cell_w - 16, cell_h - 60)
+        pygame.draw.rect(surface, (18, 18, 22), chart)
+        pygame.draw.rect(surface, (60, 60, 66), chart, 1)
+
+        vals = [float(series[d].get(key, 0.0)) for d in dates]
+        draw_series_in_rect(surface, chart, vals, fill=True, draw_points=len(vals) <= 60, xs=xs)
+
+        if dates:
+            surface.blit(font_small.render(dates[0], True, (160, 160, 160)), (chart.x, chart.bottom + 6))
+            last = font_small.render(dates[-1], True, (160, 160, 160))
+            surface.blit(last, (chart.right - last.get_width(), chart.bottom + 6))
+
+
+def render_profile(job: Dict[str, Any]) -> str | None:
+    """Отчёт одного профиля (выполняется в процессе пула)"""
+    store = StatsStore()
+    date_from, date_to = job['date_from'], job['date_to']
+
+    series = {
+        d: cell for d, cell in aggregate_by_date(store.iter_sessions(job['profile_id'])).items()
+        if (not date_from or d >= date_from) and (not date_to or d <= date_to)
+    }
+    if not series and job['skip_empty']:
+        return None
+
+    period = f"{date_from or '…'} — {date_to or '…'}"
+    surface = pygame.Surface(job['size'])
+    render_report(surface, f"{job['name']} ({job['profile_id']})   {period}", series)
+
+    path = os.path.join(job['out'], f"{job['profile_id']}_{date_from or 'all'}_{date_to or 'all'}.png")
+    pygame.image.save(surface, path)
+
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='PNG-отчёты по профилям')
+    parser.add_argument('--profiles', nargs='*', help='id профилей (по умолчанию все)')
+    parser.add_argument('--from', dest='date_from', help='YYYY-MM-DD')
+    parser.add_argument('--to', dest='date_to', help='YYYY-MM-DD')
+    parser.add_argument('--out', default=os.path.join('data', 'reports'))
+    parser.add_argument('--size', default=f'{REPORT_W}x{REPORT_H}', help='WxH')
+    parser.add_argument('--skip-empty', action='store_true', help='не строить отчёт без игр за период')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    store = StatsStore()
+    names = dict(store.profiles())
+    profile_ids = args.profiles or list(names.keys())
+    w, h = (int(v) for v in args.size.lower().split('x'))
+
+    os.makedirs(args.out, exist_ok=True)
+    jobs: List[Dict[str, Any]] = [{
+        'profile_id': pid,
+        'name': names.get(pid, pid),
+        'date_from': args.date_from,
+        'date_to': args.date_to,
+        'size': (w, h),
+        'out': args.out,
+        'skip_empty': args.skip_empty
+    } for pid in profile_ids]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        done = [p for p in pool.map(render_profile, jobs) if p]
+
+    print(f'Отчётов: {len(done)} из {len(jobs)} за {time.perf_counter() - started:.2f} c -> {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Перебор параметров сложности на безголовых симуляциях TrainerModel.
+
+    python -m src.tools.sweep --grid spawn_interval=0.6,0.8,1.0 entity_speed=2,3 --seeds 1000
+    python -m src.tools.sweep --grid max_entities=2,3,4 --players novice expert --out sweep.csv
+
+Для каждой точки сетки и модели игрока прогоняется --seeds сессий с
+фиксированным шагом времени; собираются распределения очков, максимального
+фокуса и длительности сессии.
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse, csv, itertools, random, statistics, sys, time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from src.assets import Assets
+from src.mvc.trainer_model import TrainerModel, DEFAULT_DIFFICULTY, KEY_POOL
+
+
+# модели игрока: время реакции (среднее и разброс, с), доля верных клавиш,
+# частота ложных нажатий по нецелевым сущностям (в секунду)
+PLAYER_MODELS = {
+    'novice': {'reaction': 1.2, 'reaction_sd': 0.35, 'accuracy': 0.75, 'false_alarm': 0.08},
+    'typical': {'reaction': 0.8, 'reaction_sd': 0.2, 'accuracy': 0.9, 'false_alarm': 0.03},
+    'expert': {'reaction': 0.5, 'reaction_sd': 0.1, 'accuracy': 0.97, 'false_alarm': 0.01}
+}
+
+METRICS = ['score', 'max_focus', 'time']
+
+
+def simulate(difficulty: Dict[str, Any], player: Dict[str, float], seed: int, fps: int = 60, max_time: float = 600.0) -> Dict[str, float]:
+    """
+    Одна сессия: модель и игрок со своими генераторами случайных чисел
+    :return: итоговые показатели сессии
+    """
+    rng = random.Random(seed)
+    player_rng = random.Random(f'{seed}-player')
+
+    model = TrainerModel(Assets(None), {'difficulty': difficulty}, rng=rng)
+    model.pick_new_target()
+    model.spawn_entity()
+
+    dt = 1.0 / fps
+    # id сущности-цели -> игровое время, когда игрок на неё ответит
+    planned: Dict[int, float] = {}
+
+    while model.game_running and model.current_game_time < max_time:
+        model.update(dt)
+        now = model.current_game_time
+
+        for entity in list(model.entities):
+            if entity.data != model.current_target:
+                continue
+
+            if entity.id not in planned:
+                planned[entity.id] = now + max(0.15, player_rng.gauss(player['reaction'], player['reaction_sd']))
+
+            elif now >= planned[entity.id]:
+                if player_rng.random() < player['accuracy']:
+                    key = model.current_target_key
+                else:
+                    key = player_rng.choice([k for k in KEY_POOL if k != model.current_target_key])
+
+                model.handle_selection(entity, key)
+                break
+
+        if model.game_running and player_rng.random() < player['false_alarm'] * dt:
+            distractors = [e for e in model.entities if e.data != model.current_target]
+            if distractors:
+                model.handle_selection(player_rng.choice(distractors), model.current_target_key)
+
+    return {
+        'score': model.score,
+        'max_focus': model.max_focus,
+        'time': model.current_game_time,
+        'game_over': not model.game_running
+    }
+
+
+def run_batch(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Пачка сидов одной точки сетки (выполняется в процессе пула)"""
+    player = PLAYER_MODELS[job['player']]
+    runs = [simulate(job['difficulty'], player, seed, job['fps'], job['max_time']) for seed in job['seeds']]
+
+    return {'point': job['point'], 'player': job['player'], 'runs': runs}
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    n = len(values)
+
+    def pct(q):
+        return values[min(n - 1, int(q * n))]
+
+    return {
+        'mean': statistics.fmean(values),
+        'sd': statistics.pstdev(values),
+        'p10': pct(0.1),
+        'p50': pct(0.5),
+        'p90': pct(0.9)
+    }
+
+
+def parse_grid(items: List[str]) -> Dict[str, List[Any]]:
+    grid = {}
+    for item in items:
+        name, _, vals = item.partition('=')
+        if name not in DEFAULT_DIFFICULTY:
+            raise SystemExit(f'Неизвестный параметр: {name} (есть: {", ".join(DEFAULT_DIFFICULTY)})')
+
+        grid[name] = [int(v) if isinstance(DEFAULT_DIFFICULTY[name], int) and '.' not in v else float(v) for v in vals.split(',')]
+
+    return grid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Перебор параметров сложности')
+    parser.add_argument('--grid', nargs='*', default=[], help='параметр=значение1,значение2 ...')
+    parser.add_argument('--players', nargs='*', default=['typical'], choices=list(PLAYER_MODELS))
+    parser.add_argument('--seeds', type=int, default=200, help='сессий на точку')
+    parser.add_argument('--batch', type=int, default=50, help='сессий в одной задаче пула')
+    parser.add_argument('--fps', type=int, default=60)
+    parser.add_argument('--max-time', type=float, default=600.0, help='предел длительности сессии, с')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', help='CSV с распределениями (по умолчанию stdout)')
+    args = parser.parse_args(argv)
+
+    grid = parse_grid(args.grid)
+    names = list(grid.keys())
+    points = [dict(zip(names, combo)) for combo in itertools.product(*grid.values())] or [{}]
+
+    jobs = []
+    for point_idx, point in enumerate(points):
+        for player in args.players:
+            for start in range(0, args.seeds, args.batch):
+                jobs.append({
+                    'point': point_idx,
+                    'player': player,
+                    'difficulty': point,
+                    'seeds': list(range(start, min(start + args.batch, args.seeds))),
+                    'fps': args.fps,
+                    'max_time': args.max_time
+                })
+
+    started = time.perf_counter()
+    results: Dict[tuple, List[Dict[str, float]]] = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for res in pool.map(run_batch, jobs):
+            results.setdefault((res['point'], res['player']), []).extend(res['runs'])
+
+    elapsed = time.perf_counter() - started
+    total = sum(len(r) for r in results.values())
+
+    header = names + ['player', 'sessions', 'game_over_rate']
+    header += [f'{m}_{s}' for m in METRICS for s in ('mean', 'sd', 'p10', 'p50', 'p90')]
+
+    out = open(args.out, 'w', newline='', encoding='utf-8') if args.out else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(header)
+        for (point_idx, player), runs in sorted(results.items()):
+            point = {**DEFAULT_DIFFICULTY, **points[point_idx]}
+            row = [point[n] for n in names] + [player, len(runs), sum(r['game_over'] for r in runs) / len(runs)]
+            for m in METRICS:
+                stats = summarize([r[m] for r in runs])
+                row += [round(stats[s], 3) for s in ('mean', 'sd', 'p10', 'p50', 'p90')]
+            writer.writerow(row)
+    finally:
+        if args.out:
+            out.close()
+
+    print(f'Сессий: {total} за {elapsed:.1f} c ({total / max(elapsed, 1e-9):.0f} сессий/c)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+import pygame
+
+from typing import Callable, Dict, List, Tuple
+
+
+class Widget:
+    """
+    Элемент интерфейса с сохранённым состоянием: рисуется заново,
+    только когда помечен как изменившийся
+    """
+    def __init__(self, rect) -> None:
+        self.rect = pygame.Rect(rect)
+        self.parent: 'Container | None' = None
+
+        self.hovered = False
+        self.dirty = True
+
+        # фон под элементом, снимается при полной перерисовке
+        self.backdrop: pygame.Surface | None = None
+
+    def root(self) -> 'WidgetLayer | None':
+        node = self
+        while node.parent is not None:
+            node = node.parent
+
+        return node if isinstance(node, WidgetLayer) else None
+
+    def invalidate(self) -> None:
+        """Пометить элемент для перерисовки в следующем кадре"""
+        if self.dirty:
+            return
+
+        self.dirty = True
+        layer = self.root()
+        if layer:
+            layer.damaged.append(self)
+
+    def set_hovered(self, hovered: bool) -> None:
+        if self.hovered != hovered:
+            self.hovered = hovered
+            self.invalidate()
+
+    def hit_test(self, pos: tuple) -> 'Widget | None':
+        return self if self.rect.collidepoint(pos) else None
+
+    def leaves(self) -> List['Widget']:
+        return [self]
+
+    def click(self) -> None:
+        pass
+
+    def draw(self, surface: pygame.Surface) -> None:
+        pass
+
+
+class Container(Widget):
+    """Группа элементов: проверка попадания заходит внутрь, только если точка в её границах"""
+    def __init__(self) -> None:
+        super().__init__((0, 0, 0, 0))
+        self.children: List[Widget] = []
+
+    def add(self, widget: Widget) -> Widget:
+        widget.parent = self
+        self.children.append(widget)
+        self._grow(widget.rect)
+
+        return widget
+
+    def _grow(self, rect: pygame.Rect) -> None:
+        """Расширить границы группы и её родителей до rect"""
+        if not rect.w or not rect.h:
+            return
+
+        self.rect = self.rect.union(rect) if self.rect.w and self.rect.h else rect.copy()
+        if self.parent is not None:
+            self.parent._grow(self.rect)
+
+    def hit_test(self, pos: tuple) -> Widget | None:
+        if not self.rect.collidepoint(pos):
+            return None
+
+        # последний добавленный рисуется поверх
+        for child in reversed(self.children):
+            hit = child.hit_test(pos)
+            if hit is not None:
+                return hit
+
+        return None
+
+    def leaves(self) -> List[Widget]:
+        return [leaf for child in self.children for leaf in child.leaves()]
+
+
+class Button(Widget):
+    """Кнопка с заранее отрисованными поверхностями для обычного, наведённого и выбранного вида"""
+    def __init__(self, rect, text: str, callback: Callable[[], None], font: pygame.font.Font,
+                 fill: Tuple[int, int, int] | None = None, hover_fill: Tuple[int, int, int] | None = None,
+                 selected_fill: Tuple[int, int, int] | None = None, text_color: Tuple[int, int, int] = (0, 0, 0),
+                 radius: int = 6) -> None:
+        super().__init__(rect)
+        self.text = text
+        self.callback = callback
+        self.font = font
+
+        self.fill = fill
+        self.hover_fill = hover_fill
+        self.selected_fill = selected_fill
+        self.text_color = text_color
+        self.radius = radius
+
+        self.selected = False
+        # (наведена, выбрана) -> готовая поверхность
+        self._surfaces: Dict[Tuple[bool, bool], pygame.Surface] = {}
+
+    def set_text(self, text: str) -> None:
+        if text != self.text:
+            self.text = text
+            self._surfaces.clear()
+            self.invalidate()
+
+    def set_selected(self, selected: bool) -> None:
+        if selected != self.selected:
+            self.selected = selected
+            self.invalidate()
+
+    def _surface(self) -> pygame.Surface:
+        key = (self.hovered, self.selected)
+        surf = self._surfaces.get(key)
+        if surf is None:
+            if self.hovered and self.hover_fill:
+                fill = self.hover_fill
+            elif self.selected and self.selected_fill:
+                fill = self.selected_fill
+            else:
+                fill = self.fill
+
+            surf = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            if fill:
+                pygame.draw.rect(surf, fill, surf.get_rect(), border_radius=self.radius)
+
+            txt = self.font.render(self.text, True, self.text_color)
+            surf.blit(txt, txt.get_rect(center=surf.get_rect().center))
+
+            self._surfaces[key] = surf
+
+        return surf
+
+    def click(self) -> None:
+        self.callback()
+
+    def draw(self, surface: pygame.Surface) -> None:
+        surface.blit(self._surface(), self.rect)
+
+
+class WidgetLayer(Container):
+    """
+    Корень дерева элементов: направляет события элементу под курсором
+    и перерисовывает только изменившиеся элементы поверх сохранённого фона
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.hovered_widget: Widget | None = None
+        self.damaged: List[Widget] = []
+
+    def update_hover(self, pos: tuple) -> None:
+        widget = self.hit_test(pos)
+        if widget is not self.hovered_widget:
+            if self.hovered_widget is not None:
+                self.hovered_widget.set_hovered(False)
+            if widget is not None:
+                widget.set_hovered(True)
+
+            self.hovered_widget = widget
+
+    def handle_event(self, e: pygame.event.Event) -> bool:
+        """
+        Передача события элементу под курсором
+        :return: событие было нажатием по элементу
+        """
+        if e.type == pygame.MOUSEMOTION:
+            self.update_hover(e.pos)
+
+        elif e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
+            widget = self.hit_test(e.pos)
+            if widget is not None:
+                widget.click()
+                return True
+
+        return False
+
+    def draw(self, surface: pygame.Surface, full: bool = False) -> List[pygame.Rect]:
+        """
+        Отрисовка элементов
+        :param full: фон под элементами перерисован, снять его заново и нарисовать все элементы
+        :return: обновлённые области
+        """
+        if full:
+            widgets = self.leaves()
+            bounds = surface.get_rect()
+            for w in widgets:
+                w.backdrop = surface.subsurface(w.rect.clip(bounds)).copy()
+
+        else:
+            widgets = self.damaged
+
+        rects = []
+        for w in widgets:
+            if not full and w.backdrop is not None:
+                surface.blit(w.backdrop, w.rect.topleft)
+
+            w.draw(surface)
+            w.dirty = False
+            rects.append(w.rect)
+
+        self.damaged = []
+        return rects